@@ -1,6 +1,8 @@
 import wrds
 import pandas as pd
+from datetime import date
 from pathlib import Path
+from risk_factor_pred.createList import masterIndex
 
 # Creates returns.csv file
 
@@ -9,7 +11,8 @@ SAVE_DIR = Path("data") / "tables" / "returns.csv"
 # 1. Connect
 db = wrds.Connection(wrds_username='username')
 
-df_input = pd.read_excel("master_all.xlsx")
+KEEP_FORMS = ["10-K", "10KSB", "10-KT"]
+df_input = masterIndex.query(date(2005, 1, 1), date(2025, 12, 31), forms=KEEP_FORMS, dedupe=True)
 ciks = df_input['CIK'].astype(str).str.zfill(10).tolist()
 
 def querymaker(cik):
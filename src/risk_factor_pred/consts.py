@@ -9,14 +9,39 @@ DATA_DIR = REPO_ROOT / "data"
 HTML_DIR = DATA_DIR / "html"
 HTML_DIR.mkdir(parents=True, exist_ok=True)
 SEC_DIR = HTML_DIR / "sec-edgar-filings"
+MANIFEST_PATH = HTML_DIR / "download-manifest.jsonl"                        # CIK -> accession -> fetch status
+QUARANTINE_PATH = HTML_DIR / "clean-quarantine.jsonl"                       # filings that ran out of cleaning time
 
 TABLES_DIR = DATA_DIR / "tables"
 CIK_LIST = TABLES_DIR / "cik_list.xlsx"                                     # Excel containing list of CIKS
+MASTER_INDEX_DIR = DATA_DIR / "master_index"                                # cached quarterly EDGAR master indexes
+CLEAN_CACHE_DIR = DATA_DIR / "clean_cache"                                  # cleaned filings keyed by raw hash + cleaner version
+TOKEN_VOCAB_PATH = DATA_DIR / "token_vocab.txt"                              # corpus-level token -> int32 ID vocabulary
 
+# ------------------ EDGAR endpoints ------------------
 
+EDGAR_ARCHIVES_URL = "https://www.sec.gov/Archives/edgar/data"
+EDGAR_SUBMISSIONS_URL = "https://data.sec.gov/submissions"
+EDGAR_TICKERS_URL = "https://www.sec.gov/files/company_tickers.json"
+EDGAR_FULL_INDEX_URL = "https://www.sec.gov/Archives/edgar/full-index"
 
 # ---------- SETTINGS ----------
 FORM       = "10-K"                                                 # or "10-K", "10-KT", etc.
 START_DATE = "2006-01-01"                                           # filings per CIK, only released after 2006
 MAX_WORKERS = 4                                                     # number of threads
+USER_AGENT = "MyCompanyName my.email@domain.com"                    # SEC requires a declared User-Agent
+SEC_RATE_LIMIT = 10                                                 # max requests per second allowed by SEC
+MAX_CONCURRENT_REQUESTS = 8                                         # in-flight HTTP requests for the async downloader
+MAX_CONCURRENT_CIKS = 8                                             # CIKs the async downloader works on at once
+CLEAN_WORKERS = 4                                                   # processes cleaning downloaded filings
+CLEAN_QUEUE_SIZE = 16                                               # downloaded filings waiting to be cleaned
+CLEAN_FILING_BUDGET = 300                                           # seconds allowed to clean one filing
+CLEAN_STAGE_BUDGET = 120                                            # seconds allowed to one cleaning stage
+SPLIT_WORKERS = 4                                                   # processes splitting cleaned filings into items
+SIMILARITY_WORKERS = 4                                              # processes computing similarity per CIK
+PIPELINE_QUEUE_SIZE = 8                                             # CIKs waiting between two pipeline stages
+COMPRESSION = "gzip"                                                # on-disk format of filings: None, "gzip" or "zstd"
+ITEM_STORAGE = "files"                                              # split items: "files" (item<N>.txt) or "index" (offset sidecar)
+NEW_WORDS_FROM_ALIGNMENT = False                                    # new words: set difference (False) or edit alignment (True)
+NEAR_DUPLICATE_JACCARD = 0.5                                        # estimated shingle Jaccard below which an Item 1A pair counts as rewritten
 # -------------------------------
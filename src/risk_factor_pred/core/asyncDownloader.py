@@ -0,0 +1,314 @@
+import asyncio
+import json
+import time
+import requests
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from . import documentIndex, storage
+from risk_factor_pred.consts import (FORM, START_DATE, HTML_DIR, USER_AGENT, SEC_RATE_LIMIT, MAX_CONCURRENT_REQUESTS,
+                                     MAX_CONCURRENT_CIKS, EDGAR_ARCHIVES_URL, EDGAR_SUBMISSIONS_URL, EDGAR_TICKERS_URL)
+
+# --------------------------------------------------------------------------------------------------------------------
+#                                                RATE LIMITER
+# --------------------------------------------------------------------------------------------------------------------
+
+class TokenBucket:
+    """
+    Asyncio token bucket shared by every in-flight request.
+
+    Tokens refill continuously at `rate` per second up to `capacity`. Each call to
+    `acquire()` consumes one token, waiting only as long as needed for the next one,
+    so the downloader runs right at the allowed rate instead of sleeping blindly.
+    """
+    def __init__(self, rate: float = SEC_RATE_LIMIT, capacity: float | None = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    async def acquire(self):
+        """
+        Wait until a token is available and consume it.
+        """
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+# --------------------------------------------------------------------------------------------------------------------
+#                                                ASYNC DOWNLOADER
+# --------------------------------------------------------------------------------------------------------------------
+
+class AsyncDownloader:
+    """
+    Download EDGAR filings for many CIKs concurrently under one shared rate limit.
+
+    Filings are written with the same layout `sec-edgar-downloader` uses:
+    `<save_dir>/sec-edgar-filings/<CIK>/<FORM>/<accession>/full-submission.txt`.
+    The endpoint URLs are parameters so the downloader can be pointed at a local
+    HTTP stand-in for EDGAR.
+
+    If a `DownloadManifest` is given, accessions it already records as fetched are
+    skipped and every new fetch is recorded, so an interrupted run resumes where it stopped.
+    """
+    def __init__(self, save_dir=HTML_DIR, user_agent=USER_AGENT, rate=SEC_RATE_LIMIT,
+                 max_concurrent=MAX_CONCURRENT_REQUESTS, archives_url=EDGAR_ARCHIVES_URL,
+                 submissions_url=EDGAR_SUBMISSIONS_URL, tickers_url=EDGAR_TICKERS_URL,
+                 retries=3, timeout=30, manifest=None):
+        self.save_dir = Path(save_dir)
+        self.archives_url = archives_url.rstrip("/")
+        self.submissions_url = submissions_url.rstrip("/")
+        self.tickers_url = tickers_url
+        self.retries = retries
+        self.timeout = timeout
+        self.manifest = manifest
+        self._session = requests.Session()
+        self._session.headers.update({"User-Agent": user_agent, "Accept-Encoding": "gzip, deflate"})
+        self._tickers = None
+        self._bucket = TokenBucket(rate)
+        self._slots = asyncio.Semaphore(max_concurrent)
+
+    # ------------------------------------------------ HTTP ------------------------------------------------
+
+    @staticmethod
+    def _backoff(attempt: int, response=None) -> float:
+        """
+        Seconds to wait before retry `attempt + 1`: exponential, or longer if the server
+        asked for it with a `Retry-After` header (seconds or an HTTP date).
+        """
+        delay = 2 ** attempt
+        value = response.headers.get("Retry-After") if response is not None else None
+        if value:
+            try:
+                delay = max(delay, float(value))
+            except ValueError:
+                try:
+                    delay = max(delay, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+                except (TypeError, ValueError):                                 # unparsable or naive date
+                    pass
+        return delay
+
+    async def _get(self, url: str) -> bytes:
+        """
+        GET `url` once a rate-limit token is available, retrying throttled or failed requests.
+
+        Returns the response body, or raises `FileNotFoundError` on HTTP 404.
+        """
+        for attempt in range(self.retries + 1):
+            await self._bucket.acquire()
+            async with self._slots:
+                try:
+                    r = await asyncio.to_thread(self._session.get, url, timeout=self.timeout)
+                except requests.RequestException:
+                    if attempt == self.retries:
+                        raise
+                    await asyncio.sleep(self._backoff(attempt))
+                    continue
+            if r.status_code == 404:
+                raise FileNotFoundError(url)
+            if r.status_code in (429, 500, 502, 503, 504) and attempt < self.retries:
+                await asyncio.sleep(self._backoff(attempt, r))
+                continue
+            r.raise_for_status()
+            return r.content
+
+    async def _get_json(self, url: str):
+        """
+        GET and decode a JSON document. A truncated or garbled body is fetched again like a
+        failed request; if it stays invalid, `OSError` is raised so the CIK is reported as
+        an error to retry rather than as "not_found" (`JSONDecodeError` is a `ValueError`).
+        """
+        for attempt in range(self.retries + 1):
+            content = await self._get(url)
+            try:
+                return json.loads(content)
+            except json.JSONDecodeError as e:
+                if attempt == self.retries:
+                    raise OSError(f"invalid JSON from {url}: {e}") from None
+                await asyncio.sleep(self._backoff(attempt))
+
+    # ------------------------------------------------ EDGAR ------------------------------------------------
+
+    async def resolve_cik(self, cik: str) -> str:
+        """
+        Return the 10-digit zero-padded CIK, resolving tickers through EDGAR's ticker map.
+        """
+        cik = str(cik).strip()
+        if cik.isdigit():
+            return cik.zfill(10)
+        if self._tickers is None:
+            data = await self._get_json(self.tickers_url)
+            self._tickers = {row["ticker"].upper(): str(row["cik_str"]).zfill(10) for row in data.values()}
+        try:
+            return self._tickers[cik.upper()]
+        except KeyError:
+            raise ValueError(f"Ticker {cik} not found in EDGAR ticker map") from None
+
+    async def list_filings(self, cik10: str, form: str = FORM, after: str = START_DATE) -> list[str]:
+        """
+        Return the accession numbers of all `form` filings of `cik10` filed on or after `after`.
+
+        Reads the recent-filings block of the submissions JSON and every older page it links to.
+        """
+        try:
+            data = await self._get_json(f"{self.submissions_url}/CIK{cik10}.json")
+        except FileNotFoundError:
+            raise ValueError(f"CIK {cik10} not found on EDGAR") from None
+
+        blocks = [data.get("filings", {}).get("recent", {})]
+        for page in data.get("filings", {}).get("files", []):
+            if page.get("filingTo", "9999") >= after:
+                blocks.append(await self._get_json(f"{self.submissions_url}/{page['name']}"))
+
+        accessions = []
+        for block in blocks:
+            rows = zip(block.get("accessionNumber", []), block.get("form", []), block.get("filingDate", []))
+            accessions += [acc for acc, f, filed in rows if f == form and filed >= after]
+        return accessions
+
+    def filing_dir(self, cik10: str, accession: str, form: str = FORM) -> Path:
+        return self.save_dir / "sec-edgar-filings" / cik10 / form / accession
+
+    async def fetch_filing(self, cik10: str, accession: str, form: str = FORM) -> Path:
+        """
+        Download one full submission and write it to its filing folder.
+
+        The file is written compressed through `storage`, via a temporary name that is
+        renamed into place, so a `full-submission.txt` on disk is always complete, and
+        indexed by `documentIndex`.
+        """
+        url = f"{self.archives_url}/{int(cik10)}/{accession.replace('-', '')}/{accession}.txt"
+        content = await self._get(url)
+        return await asyncio.to_thread(self._store, cik10, accession, form, content)   # gzip, scan and sha256
+
+    def _store(self, cik10: str, accession: str, form: str, content: bytes) -> Path:
+        """
+        Write, index and record one fetched submission; runs in a worker thread.
+        """
+        folder = self.filing_dir(cik10, accession, form)
+        folder.mkdir(parents=True, exist_ok=True)
+        path = folder / "full-submission.txt"
+        storage.write_bytes(path, content)
+        documentIndex.build(path, content)                                      # offsets while the bytes are at hand
+        if self.manifest is not None:
+            self.manifest.record(cik10, accession, "ok", content)
+        return path
+
+    def _pending(self, cik10: str, accessions, form: str = FORM) -> list[str]:
+        """
+        Drop accessions the manifest already has. Filings found on disk but missing
+        from the manifest (e.g. fetched by an older run) are recorded instead of refetched.
+        """
+        if self.manifest is None:
+            return list(accessions)
+        pending = []
+        for acc in self.manifest.pending(cik10, accessions):
+            path = self.filing_dir(cik10, acc, form) / "full-submission.txt"
+            if storage.exists(path):
+                self.manifest.record(cik10, acc, "ok", storage.read_bytes(path))
+            else:
+                pending.append(acc)
+        return pending
+
+    async def _fetch(self, cik10: str, accession: str, form: str, backlog):
+        """
+        `fetch_filing` once a `backlog` slot is free. The slot stays taken after a
+        successful fetch: it belongs to whoever receives the filing through `on_filing`.
+        """
+        if backlog is None:
+            return await self.fetch_filing(cik10, accession, form)
+        await backlog.acquire()
+        try:
+            return await self.fetch_filing(cik10, accession, form)
+        except BaseException:
+            backlog.release()
+            raise
+
+    async def download_cik(self, cik: str, form: str = FORM, after: str = START_DATE, on_filing=None, backlog=None):
+        """
+        Download every matching filing of one CIK.
+
+        `on_filing`, if given, is awaited with `(cik10, path)` as soon as each filing lands.
+        `backlog`, if given, is an `asyncio.Semaphore` acquired before each fetch starts and
+        released by the consumer once it is done with the filing, so that no more than its
+        initial value of filings are being fetched or waiting on disk at any time.
+        Returns `(cik, status, err)` with status "ok", "not_found" or "error", the
+        per-CIK result consumed by `secDownloader.download_n_clean`. If one filing fails,
+        the fetches still in flight are cancelled before returning.
+        """
+        print(f"Starting {form} for CIK {cik}")
+        try:
+            cik10 = await self.resolve_cik(cik)
+            listed = await self.list_filings(cik10, form, after)
+            accessions = await asyncio.to_thread(self._pending, cik10, listed, form)   # hashes files on disk
+            tasks = [asyncio.create_task(self._fetch(cik10, acc, form, backlog)) for acc in accessions]
+            handed = set()
+            try:
+                for task in asyncio.as_completed(tasks):
+                    path = await task
+                    handed.add(path)
+                    if on_filing is not None:
+                        await on_filing(cik10, path)
+            finally:
+                for task in tasks:                                              # first failure: stop the other fetches
+                    task.cancel()
+                fetched = await asyncio.gather(*tasks, return_exceptions=True)
+                if backlog is not None:                                         # landed but never handed over
+                    for path in fetched:
+                        if isinstance(path, Path) and path not in handed:
+                            backlog.release()
+            return cik, "ok", None
+        except ValueError as e:
+            return cik, "not_found", str(e)
+        except Exception as e:
+            return cik, "error", str(e)
+
+    async def download_many(self, ciks, form: str = FORM, after: str = START_DATE, on_filing=None, backlog=None,
+                            max_ciks: int = MAX_CONCURRENT_CIKS):
+        """
+        Download CIKs concurrently, yielding `(cik, status, err)` tuples as each CIK finishes.
+
+        A fixed set of `max_ciks` workers pull CIKs from `ciks`; a worker hands its result
+        over through a one-item queue before starting its next CIK, so a slow consumer of this generator
+        (or of `on_filing`, see `download_cik` for `backlog`) holds the downloads back instead
+        of letting every CIK run ahead, and requests of CIKs that are not being worked on do
+        not queue on the rate limiter.
+        """
+        todo = iter(ciks)
+        results = asyncio.Queue(maxsize=1)
+
+        async def worker():
+            for cik in todo:
+                await results.put(await self.download_cik(cik, form, after, on_filing, backlog))
+            await results.put(None)
+
+        workers = [asyncio.create_task(worker()) for _ in range(max_ciks)]
+        try:
+            running = len(workers)
+            while running:
+                result = await results.get()
+                if result is None:
+                    running -= 1
+                else:
+                    yield result
+        finally:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+def download_ciks(ciks, **kwargs) -> list[tuple]:
+    """
+    Synchronous helper: download all CIKs and return the list of `(cik, status, err)` results.
+    """
+    async def _run():
+        return [res async for res in AsyncDownloader(**kwargs).download_many(ciks)]
+    return asyncio.run(_run())
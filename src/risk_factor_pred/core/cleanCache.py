@@ -0,0 +1,92 @@
+import hashlib
+from pathlib import Path
+from risk_factor_pred.consts import CLEAN_CACHE_DIR, CLEAN_FILING_BUDGET, CLEAN_STAGE_BUDGET
+from . import storage
+
+# --------------------------------------------------------------------------------------------------------------------
+#                                                CLEANED-FILING CACHE
+# --------------------------------------------------------------------------------------------------------------------
+# Cleaned text is stored under CLEAN_CACHE_DIR/<cleaner version>/<raw sha256>.txt, so a filing is only cleaned
+# again when its raw content or the cleaning code changes. The version is a hash of the source of every module the
+# cleaned text depends on and of the cleaning budgets: editing one rule moves every filing to a new, empty version
+# directory.
+#
+# `cleaner` usually overwrites full-submission.txt with its cleaned text, so the hash of every output is also
+# recorded (<sha256>.done): a file whose content is already the output of this version needs no work.
+
+CLEANER_SOURCES = ("htmlCleaner.py", "htmlTokenizer.py", "documentIndex.py", "timeBudget.py")
+_CHUNK = 1 << 20
+_version = None
+
+def version() -> str:
+    """
+    Short hash of the source of the cleaning modules (`CLEANER_SOURCES`) and of the
+    cleaning budgets, which decide when a filing falls back to the simpler cleaner.
+    """
+    global _version
+    if _version is None:
+        h = hashlib.sha256()
+        for name in CLEANER_SOURCES:
+            h.update(Path(__file__).with_name(name).read_bytes())
+        h.update(f"budgets:{CLEAN_FILING_BUDGET}:{CLEAN_STAGE_BUDGET}".encode())
+        _version = h.hexdigest()[:16]
+    return _version
+
+def content_hash(path) -> str:
+    """
+    sha256 of the uncompressed content of the logical `path`, read in chunks.
+    """
+    h = hashlib.sha256()
+    with storage.open_bytes(path) as f:
+        while chunk := f.read(_CHUNK):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _entry(digest: str, suffix: str, version_key: str | None) -> Path:
+    return CLEAN_CACHE_DIR / (version_key or version()) / digest[:2] / f"{digest}{suffix}"
+
+def get(raw_hash: str, version_key: str | None = None) -> str | None:
+    """
+    Cleaned text for raw content `raw_hash`, or None on a miss.
+    """
+    path = _entry(raw_hash, ".txt", version_key)
+    return storage.read_text(path) if storage.exists(path) else None
+
+def is_output(digest: str, version_key: str | None = None) -> bool:
+    """
+    True if content with hash `digest` is itself an output of this cleaner version.
+    """
+    return _entry(digest, ".done", version_key).is_file()
+
+def put(raw_hash: str, cleaned: str, version_key: str | None = None):
+    """
+    Store the cleaned text of raw content `raw_hash`.
+    """
+    path = _entry(raw_hash, ".txt", version_key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    storage.write_text(path, cleaned)
+
+def mark_output(output_hash: str, version_key: str | None = None):
+    """
+    Record that content with hash `output_hash` was written by this cleaner version.
+    """
+    path = _entry(output_hash, ".done", version_key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+
+def pending(folders, raw_name: str = "full-submission.txt", version_key: str | None = None,
+            digests: dict | None = None) -> list:
+    """
+    Return the filing folders the cache cannot serve, i.e. those that need cleaning.
+    When `digests` is given, the content hash of each folder's raw file is stored in it,
+    for `htmlCleaner.clean_filing(raw_hash=...)` to reuse instead of reading the file again.
+    """
+    out = []
+    for p in folders:
+        raw = Path(p) / raw_name
+        digest = content_hash(raw)
+        if digests is not None:
+            digests[p] = digest
+        if not (is_output(digest, version_key) or storage.exists(_entry(digest, ".txt", version_key))):
+            out.append(p)
+    return out
@@ -0,0 +1,205 @@
+import json
+import mmap
+import re
+from pathlib import Path
+from . import storage
+
+# --------------------------------------------------------------------------------------------------------------------
+#                                                SUBMISSION INDEX
+# --------------------------------------------------------------------------------------------------------------------
+# A full-submission.txt is an SGML envelope: <SEC-DOCUMENT>, a <SEC-HEADER> block of "KEY: value" lines and one
+# <DOCUMENT> per attached file (10-K body, exhibits, XBRL, graphics). The index records the byte offsets of these
+# pieces once, in a small sidecar `<name>.idx.json` next to the filing, so later stages can slice out what they need
+# instead of reading and regex-searching the whole submission. Offsets refer to the uncompressed bytes.
+
+INDEX_SUFFIX = ".idx.json"
+
+_SEC_DOCUMENT = re.compile(rb'<SEC-DOCUMENT>([^\r\n:]*?)\s*:\s*(\d{8})')
+_HEADER_BLOCK = re.compile(rb'<SEC-HEADER>.*?</SEC-HEADER>', re.DOTALL)
+_HEADER_FIELD = re.compile(rb'^[ \t]*([A-Z][A-Z0-9 \-]*?):[ \t]*(\S[^\r\n]*?)[ \t]*\r?$', re.MULTILINE)
+_HEADER_TAG = re.compile(rb'^<(ACCEPTANCE-DATETIME|ACCESSION-NUMBER|TYPE|PUBLIC-DOCUMENT-COUNT|PERIOD|FILING-DATE)>([^\r\n<]*)',
+                         re.MULTILINE)
+_DOCUMENT = re.compile(rb'<DOCUMENT>(.*?)</DOCUMENT>', re.DOTALL)
+_DOCUMENT_TAG = re.compile(rb'<(TYPE|SEQUENCE|FILENAME|DESCRIPTION)>([^\r\n<]*)')
+
+def sidecar_path(path) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+def file_signature(path) -> dict:
+    """
+    Identity of the physical file backing `path`: an index is valid only for these values.
+    """
+    physical = storage.resolve(path)
+    st = physical.stat()
+    return {"file": physical.name, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+def _primary_end(buf, sec: int) -> int:
+    """
+    Offset just past the line holding the first b'<SEQUENCE>2' after `sec` (same cut as
+    `htmlCleaner.read_primary_document`), or len(buf) if there is none.
+    """
+    j = buf.find(b"<SEQUENCE>2", max(sec, 0))
+    if j == -1:
+        return len(buf)
+    ends = [k for k in (buf.find(b"\n", j), buf.find(b"\r", j)) if k != -1]
+    if not ends:
+        return len(buf)
+    eol = min(ends)
+    if buf[eol:eol + 2] == b"\r\n":
+        eol += 1
+    return eol + 1
+
+def _scan(buf) -> dict:
+    """
+    Build the index of a submission held in `buf` (bytes or mmap), without copying it.
+    """
+    index = {"sec_document": None, "header": {}, "documents": [], "primary_end": len(buf)}
+
+    m = _SEC_DOCUMENT.search(buf)
+    sec = buf.find(b"<SEC-DOCUMENT>")
+    if m:
+        index["sec_document"] = {"offset": m.start(), "name": m.group(1).decode("latin-1").strip(),
+                                 "date": m.group(2).decode("ascii")}
+    index["primary_end"] = _primary_end(buf, sec) if sec != -1 else len(buf)
+
+    h = _HEADER_BLOCK.search(buf)
+    if h:
+        header = index["header"]
+        for f in _HEADER_FIELD.finditer(buf, h.start(), h.end()):
+            header.setdefault(f.group(1).decode("latin-1").strip(), [f.start(2), f.group(2).decode("latin-1").strip()])
+        for f in _HEADER_TAG.finditer(buf, h.start(), h.end()):
+            header.setdefault(f.group(1).decode("latin-1"), [f.start(2), f.group(2).decode("latin-1").strip()])
+
+    for d in _DOCUMENT.finditer(buf):
+        doc = {"start": d.start(), "end": d.end()}
+        for t in _DOCUMENT_TAG.finditer(buf, d.start(1), d.end(1)):
+            doc.setdefault(t.group(1).decode("ascii").lower(), t.group(2).decode("latin-1").strip())
+        text = buf.find(b"<TEXT>", d.start(1), d.end(1))
+        if text != -1:
+            close = buf.rfind(b"</TEXT>", text, d.end(1))
+            doc["text"] = [text + len(b"<TEXT>"), close if close != -1 else d.end(1)]
+        index["documents"].append(doc)
+    return index
+
+def build(path, content: bytes | None = None) -> dict:
+    """
+    Index the submission stored at the logical `path` and write the sidecar.
+
+    `content` may pass the uncompressed bytes just written (e.g. by the downloader).
+    Otherwise plain files are memory-mapped and scanned in place and compressed files
+    are decompressed once in memory, since a compressed stream cannot be mapped.
+    """
+    physical = storage.resolve(path)
+    signature = file_signature(path)
+    if content is not None:
+        index = _scan(content)
+    elif physical.suffix in (".gz", ".zst"):
+        index = _scan(storage.read_bytes(path))
+    elif signature["size"] == 0:
+        index = _scan(b"")
+    else:
+        with open(physical, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            index = _scan(mm)
+    index.update(signature)
+    _save(path, index)
+    return index
+
+def _save(path, index: dict):
+    sidecar = sidecar_path(path)
+    tmp = sidecar.with_name(sidecar.name + ".part")
+    tmp.write_text(json.dumps(index), encoding="utf-8")
+    tmp.replace(sidecar)
+
+def cached(path) -> dict | None:
+    """
+    Return the sidecar index of `path` if it still matches the file on disk, else None.
+    """
+    sidecar = sidecar_path(path)
+    if not sidecar.is_file() or not storage.exists(path):
+        return None
+    try:
+        index = json.loads(sidecar.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    signature = file_signature(path)
+    return index if all(index.get(k) == v for k, v in signature.items()) else None
+
+def load(path) -> dict:
+    """
+    Return the index of `path`, building it if the sidecar is missing or stale.
+    """
+    return cached(path) or build(path)
+
+def rebind(path, index: dict) -> dict:
+    """
+    Keep the filing-level fields of `index` (SEC-DOCUMENT line, header) for the file now
+    stored at `path`, e.g. after the submission was overwritten by its cleaned text.
+    Document offsets no longer apply and are dropped.
+    """
+    index = {"sec_document": index.get("sec_document"), "header": index.get("header", {}),
+             "documents": [], "primary_end": None, **file_signature(path)}
+    _save(path, index)
+    return index
+
+# --------------------------------------------------------------------------------------------------------------------
+#                                                READERS
+# --------------------------------------------------------------------------------------------------------------------
+
+def read_range(path, start: int, end: int) -> bytes:
+    """
+    Return bytes [start, end) of the logical `path` without reading the rest of the file.
+    """
+    physical = storage.resolve(path)
+    if physical.suffix in (".gz", ".zst"):
+        with storage.open_bytes(path) as f:
+            f.seek(start)                                                       # decompresses up to `start`
+            return f.read(end - start)
+    with open(physical, "rb") as f:
+        if end <= start:
+            return b""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm[start:end]
+
+def document(path, type_: str | None = None, sequence: str | None = None, index: dict | None = None) -> str | None:
+    """
+    Return the <TEXT> body of the first document matching `type_` and/or `sequence`
+    (e.g. type_="10-K" or sequence="1"), or None if the submission has no such document.
+    """
+    index = index or load(path)
+    for doc in index["documents"]:
+        if type_ is not None and doc.get("type") != type_:
+            continue
+        if sequence is not None and doc.get("sequence") != sequence:
+            continue
+        start, end = doc.get("text", (doc["start"], doc["end"]))
+        return read_range(path, start, end).decode("utf-8", errors="replace")
+    return None
+
+def primary_document(path) -> str | None:
+    """
+    Text of the submission up to its primary document boundary (see `_primary_end`), with
+    universal newlines, read through the index. Returns None when that would require
+    decompressing the whole file to build the index; callers then stream it instead.
+    """
+    index = cached(path)
+    if index is None:
+        if storage.resolve(path).suffix in (".gz", ".zst"):
+            return None
+        index = build(path)
+    if index.get("primary_end") is None:
+        return None
+    text = read_range(path, 0, index["primary_end"]).decode("utf-8")
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+def filing_date(path) -> str | None:
+    """
+    YYYYMMDD date on the '<SEC-DOCUMENT><accession>.txt : YYYYMMDD' line, if indexed.
+
+    Only an existing, current sidecar is read: sidecars are built where the raw submission
+    is written, and a cleaned filing without one has lost the line, so indexing it here
+    would read the whole file for nothing (callers fall back to scanning it).
+    """
+    index = cached(path)
+    sec = index.get("sec_document") if index else None
+    return sec["date"] if sec else None
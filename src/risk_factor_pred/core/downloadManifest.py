@@ -0,0 +1,64 @@
+import hashlib
+import json
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from risk_factor_pred.consts import MANIFEST_PATH
+
+class DownloadManifest:
+    """
+    Persistent record of fetched filings: CIK -> accession -> {status, size, fetched_at, sha256}.
+
+    The manifest is an append-only JSON-lines file; when an accession appears more than
+    once the last record wins. Every record is flushed as soon as it is written, so a
+    crashed run can resume from the last filing it finished. Records may come from
+    worker threads (`AsyncDownloader` hashes and writes filings off the event loop),
+    so appends are serialized by a lock.
+    """
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = Path(path)
+        self.entries: dict[str, dict[str, dict]] = {}
+        self._lock = threading.Lock()
+        if self.path.is_file():
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        row = json.loads(line)
+                    except json.JSONDecodeError:                                # torn last line after a crash
+                        continue
+                    self.entries.setdefault(row["cik"], {})[row["accession"]] = row
+
+    def is_done(self, cik: str, accession: str) -> bool:
+        """
+        True if the accession has already been fetched successfully.
+        """
+        return self.entries.get(cik, {}).get(accession, {}).get("status") == "ok"
+
+    def pending(self, cik: str, accessions) -> list[str]:
+        """
+        Return the accessions of `cik` that have not been fetched yet, in input order.
+        """
+        return [acc for acc in accessions if not self.is_done(cik, acc)]
+
+    def record(self, cik: str, accession: str, status: str, content: bytes | None = None):
+        """
+        Append a record for one accession and flush it to disk.
+        """
+        row = {
+            "cik": cik,
+            "accession": accession,
+            "status": status,
+            "size": len(content) if content is not None else None,
+            "fetched_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "sha256": hashlib.sha256(content).hexdigest() if content is not None else None,
+        }
+        with self._lock:
+            self.entries.setdefault(cik, {})[accession] = row
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(row) + "\n")
+                f.flush()
+        return row
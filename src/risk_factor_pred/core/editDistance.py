@@ -0,0 +1,446 @@
+import numpy as np
+from bisect import bisect_left
+from math import isqrt
+
+# --------------------------------------------------------------------------------------------------------------------
+#                                                BIT-PARALLEL EDIT DISTANCE
+# --------------------------------------------------------------------------------------------------------------------
+# Levenshtein distance over token sequences with the bit-vector algorithm of Myers (1999) in the formulation of
+# Hyyrö (2001). One column of the DP table is held as two bit vectors of vertical deltas (+1 / -1), one bit per
+# token of the shorter sequence, and each token of the longer sequence advances the whole column with a dozen
+# big-integer operations. Python ints have no fixed width, so a single "word" covers any sequence length:
+# the cost is O(m * n / 64) machine-word operations instead of m * n interpreted DP cells.
+# Tokens are interned to integer IDs first, so the match masks are looked up by ID rather than by string.
+
+def intern(*sequences):
+    """
+    Map the tokens of `sequences` to dense integer IDs, shared across all of them.
+
+    Returns (vocabulary, [list of IDs per sequence]).
+    """
+    vocab = {}
+    out = []
+    for seq in sequences:
+        out.append([vocab.setdefault(t, len(vocab)) for t in seq])
+    return vocab, out
+
+def match_masks(pattern) -> dict:
+    """
+    Map each ID of `pattern` to the bit mask of the positions at which it occurs.
+    """
+    positions = {}
+    for j, t in enumerate(pattern):
+        positions.setdefault(t, []).append(j)
+    masks = {}
+    for t, js in positions.items():
+        bits = bytearray((len(pattern) + 8) // 8)
+        for j in js:
+            bits[j >> 3] |= 1 << (j & 7)
+        masks[t] = int.from_bytes(bits, "little")
+    return masks
+
+def levenshtein(a, b, progress=None, max_distance: int | None = None, rewritten: bool = False) -> int | None:
+    """
+    Levenshtein distance between the ID sequences `a` and `b` (unit insert, delete and
+    substitute costs), equal to the Wagner-Fischer DP.
+
+    The common prefix and suffix are dropped first (`trim`), and the unchanged blocks give an
+    upper bound on the distance (`anchored_bound`), as does `max_distance`. Under a bound the
+    cheaper exact method runs: the banded algorithm (`banded_levenshtein`, ~bound^2 steps) or
+    the bit-parallel pass over the band of diagonals (`banded_bit_parallel`). Without one,
+    the banded algorithm is tried with half the distance at which it costs as much as the
+    bit-parallel pass (`band_width`), so a miss costs at most a quarter of that pass.
+    With `max_distance`, returns None as soon as the distance is known to exceed it.
+    With `rewritten` (pairs known to share little text, e.g. from `nearDuplicate.jaccard`),
+    the searches for unchanged text are skipped and the bit-parallel pass runs directly.
+
+    `progress`, if given, is called as progress(rows_done, rows_total) every 1000 rows
+    (every block of rows in the banded pass) and at the end.
+    """
+    return _levenshtein(a, b, progress, max_distance, anchored=not rewritten, search=not rewritten)
+
+def _levenshtein(a, b, progress, max_distance, anchored: bool, search: bool = True):
+    a, b = trim(list(a), list(b))
+    if len(a) < len(b):
+        a, b = b, a                                                             # bits for the shorter sequence
+    m, n = len(a), len(b)
+    if max_distance is not None and m - n > max_distance:
+        return None
+    if n == 0:
+        return m
+    bound = max_distance
+    if anchored:
+        upper = anchored_bound(a, b)
+        if upper is not None and upper == bag_bound(a, b):                      # tight: it is the distance
+            if progress is not None:
+                progress(m, m)
+            return upper if max_distance is None or upper <= max_distance else None
+        if upper is not None and (bound is None or upper < bound):
+            bound = upper
+    if bound is None:
+        band = band_width(m, n)
+        if search and m - n <= band:
+            d = banded_levenshtein(a, b, band)
+            if d is not None:
+                if progress is not None:
+                    progress(m, m)
+                return d
+        return _bit_parallel(a, b, progress)
+    cols = _band_columns(m, n, bound)
+    if bound <= isqrt(m * (2 + cols // 2000)):                                  # cheaper than the banded pass
+        d = banded_levenshtein(a, b, bound)
+        if progress is not None:
+            progress(m, m)
+        return d
+    if 2 * cols < n:
+        return banded_bit_parallel(a, b, bound, progress)
+    return _bit_parallel(a, b, progress, max_distance)
+
+def _bit_parallel(a, b, progress=None, max_distance: int | None = None) -> int | None:
+    """
+    The bit-parallel pass over the full DP table, `a` being the longer sequence.
+    """
+    m, n = len(a), len(b)
+    peq = match_masks(b)
+    full = (1 << n) - 1
+    last = 1 << (n - 1)
+    vp, vn, score = full, 0, n
+
+    for i, t in enumerate(a, start=1):
+        eq = peq.get(t, 0)
+        xv = eq | vn
+        xh = (((eq & vp) + vp) ^ vp) | eq
+        ph = vn | (full & ~(xh | vp))
+        mh = vp & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & full                                             # row 0 of the DP is 0, 1, 2, ...
+        mh = (mh << 1) & full
+        vp = mh | (full & ~(xv | ph))
+        vn = ph & xv
+        if progress is not None and (i % 1000 == 0 or i == m):
+            progress(i, m)
+        if max_distance is not None and score - (m - i) > max_distance:        # each row lowers it by at most 1
+            return None
+    return score if max_distance is None or score <= max_distance else None
+
+# --------------------------------------------------------------------------------------------------------------------
+#                                                BANDED EDIT DISTANCE
+# --------------------------------------------------------------------------------------------------------------------
+# Landau-Vishkin: for e = 0, 1, 2, ... keep, on each diagonal d = j - i, the furthest row reachable with e edits,
+# extend it along runs of equal tokens, and stop at the first e that reaches the end. Only diagonals |d| <= e
+# are visited (Ukkonen's band), so a pair at distance d costs O(d^2) steps plus the equal runs, which are
+# compared as list slices in doubling steps. Year-over-year Item 1A pairs are mostly such near-copies.
+
+def band_width(m: int, n: int) -> int:
+    """
+    Band to try before the bit-parallel pass on an m x n pair (m >= n). Measured costs:
+    about 1.2us per banded step (e^2 steps at distance e) against 1.8us + n * 0.5ns
+    per bit-parallel row.
+    """
+    return isqrt(m * (2 + n // 2000)) // 2
+
+def _slide(a, b, i: int, j: int) -> int:
+    """
+    Length of the common run of a[i:] and b[j:].
+    """
+    start, step = i, 1
+    m, n = len(a), len(b)
+    while step:
+        if i + step <= m and j + step <= n and a[i:i + step] == b[j:j + step]:
+            i, j = i + step, j + step
+            step *= 2
+        else:
+            step //= 2
+    return i - start
+
+def banded_levenshtein(a, b, max_distance: int) -> int | None:
+    """
+    Exact Levenshtein distance between `a` and `b` if it is at most `max_distance`, else None.
+    """
+    m, n = len(a), len(b)
+    if abs(m - n) > max_distance:
+        return None
+    target = n - m                                                              # diagonal of the end cell
+    reach = {0: _slide(a, b, 0, 0)}                                             # diagonal -> furthest row
+    if target == 0 and reach[0] >= m:
+        return 0
+    for e in range(1, max_distance + 1):
+        prev = reach
+        reach = {}
+        for d in range(max(-e, -m), min(e, n) + 1):
+            i = max(prev.get(d, -1) + 1,                                        # substitution
+                    prev.get(d + 1, -1) + 1,                                    # deletion from a
+                    prev.get(d - 1, -1))                                        # insertion into a
+            i = min(i, m, n - d)
+            if i < 0 or i + d < 0:
+                continue
+            i += _slide(a, b, i, i + d)
+            reach[d] = i
+        if reach.get(target, -1) >= m:
+            return e
+    return None
+
+# --------------------------------------------------------------------------------------------------------------------
+#                                                UNCHANGED TEXT
+# --------------------------------------------------------------------------------------------------------------------
+# Year-over-year Item 1A sections keep most of their text verbatim. A common prefix and suffix can always be dropped
+# (some optimal alignment matches them token for token). Unchanged blocks in the middle are found patience-diff
+# style: `a` is cut into _ANCHOR_SIZE-token blocks, those that occur exactly once in `b` are matched by a rolling
+# hash, and the longest chain in the same order on both sides is kept. Aligning the blocks with each other and
+# the gaps between them separately gives an alignment, so the summed gap distances bound the distance from above.
+# It is not always the distance (moved text may align better across a block), so the bound only sets the band
+# of the exact pass below; when it meets the bag-of-words lower bound (`bag_bound`) it is the distance itself.
+
+_ANCHOR_SIZE = 32
+_ANCHOR_COVER = 0.5                                                             # share of `b` the blocks must cover
+_HASH_BASE = 0x100000001B3
+
+def trim(a, b):
+    """
+    `a` and `b` without their common prefix and suffix.
+    """
+    p = _slide(a, b, 0, 0)
+    a, b = a[p:], b[p:]
+    s = _slide(a[::-1], b[::-1], 0, 0)
+    return a[:len(a) - s], b[:len(b) - s]
+
+def _window_hashes(x, size: int) -> np.ndarray:
+    """
+    Polynomial hash (mod 2^64) of every window x[j:j + size].
+    """
+    powers = np.array([pow(_HASH_BASE, size - 1 - t, 1 << 64) for t in range(size)], dtype=np.uint64)
+    windows = np.lib.stride_tricks.sliding_window_view(np.asarray(x, dtype=np.uint64), size)
+    return windows @ powers
+
+def anchors(a, b, size: int = _ANCHOR_SIZE) -> list:
+    """
+    Unchanged blocks of `a` found in `b`, as (i, j, length) with a[i:i + length] == b[j:j + length],
+    increasing and non-overlapping on both sides.
+    """
+    if len(a) < size or len(b) < size:
+        return []
+    starts = np.arange(0, len(a) - size + 1, size)
+    block = _window_hashes(a, size)[starts]
+    hb = _window_hashes(b, size)
+    order = np.argsort(hb, kind="stable")
+    sorted_hb = hb[order]
+    lo = np.searchsorted(sorted_hb, block, "left")
+    hi = np.searchsorted(sorted_hb, block, "right")
+    values, counts = np.unique(block, return_counts=True)
+    unique_in_a = np.isin(block, values[counts == 1])
+    keep = (hi - lo == 1) & unique_in_a
+    pairs = [(int(i), int(order[k])) for i, k in zip(starts[keep], lo[keep])]
+
+    # longest chain increasing in b (patience sorting), keeping back links
+    tails, tail_idx, back = [], [], [-1] * len(pairs)
+    for idx, (_, j) in enumerate(pairs):
+        pos = bisect_left(tails, j)
+        back[idx] = tail_idx[pos - 1] if pos else -1
+        if pos == len(tails):
+            tails.append(j)
+            tail_idx.append(idx)
+        else:
+            tails[pos], tail_idx[pos] = j, idx
+    chain = []
+    idx = tail_idx[-1] if tail_idx else -1
+    while idx >= 0:
+        chain.append(pairs[idx])
+        idx = back[idx]
+
+    out = []
+    for i, j in reversed(chain):
+        if a[i:i + size] != b[j:j + size]:                                      # hash collision
+            continue
+        if out:
+            pi, pj, pl = out[-1]
+            if i == pi + pl and j == pj + pl:
+                out[-1] = (pi, pj, pl + size)
+                continue
+            if j < pj + pl:                                                     # overlaps the previous block in b
+                continue
+        out.append((i, j, size))
+    return out
+
+def anchored_bound(a, b) -> int | None:
+    """
+    Distance of the alignment that matches the `anchors` blocks and aligns the gaps
+    between them optimally: an upper bound on `levenshtein(a, b)`. None if the blocks
+    cover less than _ANCHOR_COVER of the shorter sequence.
+    """
+    blocks = anchors(a, b)
+    if sum(length for _, _, length in blocks) < _ANCHOR_COVER * min(len(a), len(b)):
+        return None
+    total, i0, j0 = 0, 0, 0
+    for i, j, length in blocks + [(len(a), len(b), 0)]:
+        total += _levenshtein(a[i0:i], b[j0:j], None, None, anchored=False)
+        i0, j0 = i + length, j + length
+    return total
+
+def bag_bound(a, b) -> int:
+    """
+    Lower bound on `levenshtein(a, b)`: an alignment matches at most the tokens the two
+    sequences share (counted with multiplicity), and each other token of the longer one costs 1.
+    """
+    size = max(max(a, default=0), max(b, default=0)) + 1
+    shared = np.minimum(np.bincount(a, minlength=size), np.bincount(b, minlength=size)).sum()
+    return max(len(a), len(b)) - int(shared)
+
+# --------------------------------------------------------------------------------------------------------------------
+#                                                BANDED BIT-PARALLEL PASS
+# --------------------------------------------------------------------------------------------------------------------
+# An alignment of cost <= k only visits diagonals j - i within `slack` = (k - |n - m|) / 2 of the band between the
+# start and end diagonals, so only those cells are needed for an exact answer when the distance is at most k.
+# Rows are processed in blocks: each block runs the bit-parallel recurrence over the columns its rows can reach,
+# starting from the previous block's last row. Cells left of a block's window are replaced by the upper bound
+# D[i][c0] + 1 per row, which is the recurrence's own left-edge input, and new columns on the right by
+# D[i][c - 1] + 1. Every value computed is then an upper bound, exact along any alignment of cost <= k.
+
+def _band_columns(m: int, n: int, k: int) -> int:
+    """
+    Width, in columns, of the band of diagonals alignments of cost <= k can visit.
+    """
+    return abs(n - m) + 2 * max((k - abs(n - m)) // 2, 0) + 1
+
+def _bits(x: np.ndarray) -> int:
+    return int.from_bytes(np.packbits(x.astype(np.uint8), bitorder="little").tobytes(), "little")
+
+def _unbits(x: int, n: int) -> np.ndarray:
+    raw = np.frombuffer(x.to_bytes((n + 7) // 8, "little"), dtype=np.uint8)
+    return np.unpackbits(raw, bitorder="little")[:n].astype(np.int64)
+
+def _advance(rows, peq, full: int, vp: int, vn: int):
+    """
+    Run the bit-parallel recurrence over `rows`, from the vertical delta vectors `vp`, `vn`.
+    """
+    for t in rows:
+        eq = peq.get(t, 0)
+        xv = eq | vn
+        xh = (((eq & vp) + vp) ^ vp) | eq
+        ph = vn | (full & ~(xh | vp))
+        mh = vp & xh
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        vp = mh | (full & ~(xv | ph))
+        vn = ph & xv
+    return vp, vn
+
+def banded_bit_parallel(a, b, max_distance: int, progress=None) -> int | None:
+    """
+    Exact Levenshtein distance between `a` and `b` if it is at most `max_distance`, else None,
+    computing only the cells within the band of diagonals such alignments can visit.
+    """
+    m, n = len(a), len(b)
+    slack = (max_distance - abs(n - m)) // 2
+    if slack < 0:
+        return None
+    lo, hi = min(0, n - m) - slack, max(0, n - m) + slack                       # diagonals j - i of the band
+    height = max(hi - lo, 256)
+    c0, row = 0, np.arange(min(n, hi) + 1, dtype=np.int64)                      # row 0 on columns c0..c0 + len - 1
+    for r0 in range(0, m, height):
+        r1 = min(r0 + height, m)
+        w0, w1 = max(0, r0 + lo), min(n, r1 + hi)
+        top = row[w0 - c0:]
+        if w0 + len(top) - 1 < w1:                                              # columns the band now reaches
+            top = np.concatenate([top, top[-1] + np.arange(1, w1 - w0 - len(top) + 2)])
+        width = w1 - w0
+        if width == 0:
+            row, c0 = top + (r1 - r0), w0
+            continue
+        delta = np.diff(top)
+        vp, vn = _advance(a[r0:r1], match_masks(b[w0:w1]), (1 << width) - 1, _bits(delta > 0), _bits(delta < 0))
+        row = np.empty(width + 1, dtype=np.int64)
+        row[0] = top[0] + (r1 - r0)
+        np.cumsum(_unbits(vp, width) - _unbits(vn, width), out=row[1:])
+        row[1:] += row[0]
+        c0 = w0
+        if progress is not None:
+            progress(r1, m)
+        if row.min() > max_distance:                                            # every alignment crosses this row
+            return None
+    d = int(row[n - c0])
+    return d if d <= max_distance else None
+
+# --------------------------------------------------------------------------------------------------------------------
+#                                                ALIGNMENT (HIRSCHBERG)
+# --------------------------------------------------------------------------------------------------------------------
+# An optimal edit script in linear memory: split `a` in half, find where an optimal path crosses the middle row
+# from a forward and a reverse DP row, and recurse on both halves. The rows come from the same bit-parallel
+# recurrence: after reading a[:i], the vertical delta vectors give D[i][j] for every j by a prefix sum.
+# Sub-problems smaller than _SMALL_AREA cells (or one token wide) are solved with a full DP table and backtrace.
+
+_SMALL_AREA = 4096
+
+def last_row(a, b):
+    """
+    Row len(a) of the Levenshtein DP between `a` and `b`: D[len(a)][j] for j = 0..len(b).
+    """
+    m, n = len(a), len(b)
+    if n == 0:
+        return np.array([m], dtype=np.int64)
+    full = (1 << n) - 1
+    vp, vn = _advance(a, match_masks(b), full, full, 0)
+    row = np.empty(n + 1, dtype=np.int64)
+    row[0] = m
+    np.cumsum(_unbits(vp, n) - _unbits(vn, n), out=row[1:])
+    row[1:] += m
+    return row
+
+def _table_ops(a, b, ops):
+    """
+    Append the per-token operations (tags) of an optimal alignment of a small sub-problem.
+    """
+    m, n = len(a), len(b)
+    d = [list(range(n + 1))]
+    for i in range(1, m + 1):
+        prev, cur, ai = d[-1], [i] + [0] * n, a[i - 1]
+        for j in range(1, n + 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ai != b[j - 1]))
+        d.append(cur)
+    out = []
+    i, j = m, n
+    while i or j:
+        if i and j and d[i][j] == d[i - 1][j - 1] + (a[i - 1] != b[j - 1]):
+            out.append("equal" if a[i - 1] == b[j - 1] else "replace")
+            i, j = i - 1, j - 1
+        elif i and d[i][j] == d[i - 1][j] + 1:
+            out.append("delete")
+            i -= 1
+        else:
+            out.append("insert")
+            j -= 1
+    ops.extend(reversed(out))
+
+def _hirschberg(a, b, ops):
+    m, n = len(a), len(b)
+    if m <= 1 or n <= 1 or m * n <= _SMALL_AREA:
+        _table_ops(a, b, ops)
+        return
+    mid = m // 2
+    forward = last_row(a[:mid], b)
+    reverse = last_row(a[mid:][::-1], b[::-1])
+    j = int(np.argmin(forward + reverse[::-1]))
+    _hirschberg(a[:mid], b[:j], ops)
+    _hirschberg(a[mid:], b[j:], ops)
+
+def alignment(a, b) -> list:
+    """
+    Optimal edit script turning `a` into `b`, as difflib-style opcodes
+    (tag, i1, i2, j1, j2) with tag in "equal", "replace", "delete", "insert".
+    Its cost (replace/delete/insert tokens) equals `levenshtein(a, b)`.
+    """
+    ops = []
+    _hirschberg(list(a), list(b), ops)
+    opcodes = []
+    i = j = 0
+    for tag in ops:
+        di, dj = (0, 1) if tag == "insert" else (1, 0) if tag == "delete" else (1, 1)
+        if opcodes and opcodes[-1][0] == tag:
+            t, i1, _, j1, _ = opcodes[-1]
+            opcodes[-1] = (t, i1, i + di, j1, j + dj)
+        else:
+            opcodes.append((tag, i, i + di, j, j + dj))
+        i, j = i + di, j + dj
+    return opcodes
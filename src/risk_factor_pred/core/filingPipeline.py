@@ -0,0 +1,133 @@
+import asyncio
+from pathlib import Path
+from risk_factor_pred.consts import (CLEAN_WORKERS, SPLIT_WORKERS, SIMILARITY_WORKERS, PIPELINE_QUEUE_SIZE,
+                                     CLEAN_FILING_BUDGET, CLEAN_STAGE_BUDGET, MAX_CONCURRENT_CIKS)
+from . import htmlCleaner, fx_splitter_10X as fs, fx_similarity as sf, storage
+from .timeBudget import TimeBudget, BudgetExceeded
+from .asyncDownloader import AsyncDownloader
+from .downloadManifest import DownloadManifest
+from .pipeline import Stage, StageStats, run_stages
+
+# --------------------------------------------------------------------------------------------------------------------
+#                                                STAGE FUNCTIONS
+# --------------------------------------------------------------------------------------------------------------------
+# Each stage receives and returns a dict {"cik": <10-digit CIK>, "filings": [<filing folders>], ...}
+# and runs inside a process pool, so the functions must stay at module level.
+
+def clean_stage(item):
+    """
+    Clean the newly downloaded filings of one CIK.
+    """
+    item["formats"] = []
+    for p in item["filings"]:
+        htmlCleaner.clean_filing(p, output_filename="full-submission.txt", records=item["formats"])
+    return item
+
+def split_stage(item):
+    """
+    Split the newly cleaned filings of one CIK into per-item text files.
+    """
+    for p in item["filings"]:
+        fs.try_exercize(p)
+    return item
+
+def item1A_stage(item):
+    """
+    Extract only Item 1A of the newly downloaded filings of one CIK, cleaning just that
+    section; filings where it cannot be located are cleaned and split in full.
+    """
+    item["formats"] = []
+    for p in item["filings"]:
+        try:
+            with TimeBudget(CLEAN_FILING_BUDGET, CLEAN_STAGE_BUDGET) as budget:
+                done = fs.extract_item1A(p, budget=budget, records=item["formats"])
+        except BudgetExceeded:
+            done = None
+        if done is None:
+            htmlCleaner.clean_filing(p, output_filename="full-submission.txt", records=item["formats"])
+            fs.try_exercize(p)
+    return item
+
+def similarity_stage(item):
+    """
+    Compute the consecutive Item 1A comparisons of one CIK that involve a filing of this run;
+    pairs between older filings are already in the output from earlier runs.
+    """
+    cik = item["cik"]
+    fresh = {Path(p).name for p in item["filings"]}
+    item["triage"] = []
+    item["rows"] = [sf.process_comps(comps, cik, records=item["triage"]) for comps in sf.make_comps(cik)
+                    if comps["filing1"] in fresh or comps["filing2"] in fresh]
+    return item
+
+# --------------------------------------------------------------------------------------------------------------------
+#                                                RUNNER
+# --------------------------------------------------------------------------------------------------------------------
+
+def download_source(ciks, stats: StageStats, downloader=None, max_ciks: int = MAX_CONCURRENT_CIKS):
+    """
+    Build the pipeline source: download CIKs with the async downloader and emit one
+    item per CIK, carrying only the filings fetched in this run, as soon as the CIK is done.
+
+    At most `max_ciks` CIKs are downloaded at once, and none starts while `emit` waits
+    on a full first stage, so the filings on disk ahead of the pipeline stay bounded and
+    the first CIKs reach the stages without waiting behind every submissions request.
+    """
+    def source(emit):
+        async def _run():
+            fresh = {}
+
+            async def on_filing(cik10, path):
+                stats.add(storage.size(path))
+                fresh.setdefault(cik10, []).append(path.parent)
+
+            dl = downloader if downloader is not None else AsyncDownloader(manifest=DownloadManifest())
+            async for cik, status, err in dl.download_many(ciks, on_filing=on_filing, max_ciks=max_ciks):
+                filings = fresh.pop(str(cik).zfill(10), [])
+                print(f"CIK {cik}: {status} ({len(filings)} new filings)")
+                if filings:
+                    await asyncio.to_thread(emit, {"cik": str(cik).zfill(10), "filings": filings})
+        asyncio.run(_run())
+    return source
+
+def run_pipeline(ciks, writer, item1a_only: bool = False):
+    """
+    Run download -> clean -> split -> similarity for `ciks` as one streaming pipeline.
+    With `item1a_only`, clean and split are replaced by a single stage that cleans
+    only the Item 1A section (`item1A_stage`), which is all the similarity stage reads.
+
+    A CIK moves to the next stage as soon as the previous one finishes it; bounded
+    queues between stages apply backpressure and each stage has its own worker count
+    (see `consts`). Similarity rows are written with `writer.writerows` as CIKs complete.
+    Returns the list of stages, whose `stats` and `errors` describe the run; cleaning
+    counts and timings are also reported per filing format (HTML or plain text), and
+    similarity pairs per triage kind (identical pairs are short-circuited, see `sf.triage`).
+    """
+    download_stats = StageStats("download")
+    if item1a_only:
+        stages = [Stage("item1A", item1A_stage, CLEAN_WORKERS, PIPELINE_QUEUE_SIZE)]
+    else:
+        stages = [
+            Stage("clean", clean_stage, CLEAN_WORKERS, PIPELINE_QUEUE_SIZE),
+            Stage("split", split_stage, SPLIT_WORKERS, PIPELINE_QUEUE_SIZE),
+        ]
+    stages.append(Stage("similarity", similarity_stage, SIMILARITY_WORKERS, PIPELINE_QUEUE_SIZE))
+    formats, triaged = [], []
+
+    def sink(item):
+        writer.writerows(item["rows"])
+        formats.extend(item.get("formats", ()))
+        triaged.extend(item.get("triage", ()))
+
+    run_stages(download_source(ciks, download_stats), stages, sink=sink)
+
+    print()
+    print(download_stats.report())
+    for stage in stages:
+        print(stage.stats.report())
+        for item, err in stage.errors:
+            print(f"  {stage.name} failed for CIK {item['cik']}: {err}")
+    for line in htmlCleaner.format_report(formats):
+        print(f"  cleaned {line}")
+    print(f"  {sf.triage_report(triaged)}")
+    return stages
@@ -1,7 +1,10 @@
 from itertools import repeat
 from concurrent.futures import ProcessPoolExecutor
 from nltk.sentiment import SentimentIntensityAnalyzer
-from risk_factor_pred.consts import SEC_DIR, MAX_WORKERS
+from risk_factor_pred.consts import SEC_DIR, MAX_WORKERS, NEW_WORDS_FROM_ALIGNMENT, NEAR_DUPLICATE_JACCARD
+from . import documentIndex, editDistance, itemIndex, nearDuplicate, storage, tokenCache
+import numpy as np
+import hashlib
 import nltk
 import sys
 import re
@@ -23,12 +26,14 @@ def check_date(folder):
     """
     filing = folder.name
     file = folder / "full-submission.txt"
-    with open(file, "r", encoding="utf-8", errors="replace") as f:
-        for line in f:
-            hay = line.lower()
-            if filing in hay:
-                date = hay.partition(":")[2].lstrip()
-                break
+    date = documentIndex.filing_date(file)                                  # sidecar index, if the header was seen
+    if date is None:
+        with storage.open_text(file, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                hay = line.lower()
+                if filing in hay:
+                    date = hay.partition(":")[2].lstrip()
+                    break
     info_dict = {
         "year": date[:4],
         "month": date[4:6],
@@ -56,13 +61,60 @@ def order_filings(records):
         out.append([filing_id, filing_date])
     return out
 
+def has_item1A(folder) -> bool:
+    """
+    True if the filing folder has an `item1A.txt` or an item offset index with Item 1A.
+    """
+    return storage.exists(folder / "item1A.txt") or itemIndex.has_item(folder / "full-submission.txt", "1A")
+
+def read_item1A(folder) -> str:
+    """
+    Item 1A text of a filing folder, from `item1A.txt` if present, otherwise sliced out
+    of the cleaned `full-submission.txt` through its item offset index.
+    """
+    path = folder / "item1A.txt"
+    if storage.exists(path):
+        return storage.read_text(path, encoding="utf-8", errors="ignore")
+    text = itemIndex.read_item(folder / "full-submission.txt", "1A", errors="ignore")
+    if text is None:
+        raise FileNotFoundError(f"No Item 1A for {folder}")
+    return text
+
+def item1A_source(folder) -> dict:
+    """
+    Signature of the text `read_item1A` returns for a filing folder: the physical
+    `item1A.txt`, or the cleaned filing and the byte range of its indexed Item 1A.
+    """
+    path = folder / "item1A.txt"
+    if storage.exists(path):
+        return documentIndex.file_signature(path)
+    path = folder / "full-submission.txt"
+    index = itemIndex.cached(path)
+    return {**documentIndex.file_signature(path), "range": index["items"].get("1A") if index else None}
+
+def item1A_tokens(folder):
+    """
+    Item 1A of a filing folder as an int32 array of token IDs (see `tokenCache`),
+    tokenized once and reused until the item text or the tokenizer changes.
+    """
+    return tokenCache.token_ids(folder / "item1A", item1A_source(folder), TOKENIZER_VERSION,
+                                lambda: read_item1A(folder), tokenize)
+
+def item1A_fingerprint(folder, ids) -> dict:
+    """
+    {"digest", "minhash"} of the Item 1A token IDs `ids` of a filing folder (see `nearDuplicate`),
+    as stored by `item1A_tokens`.
+    """
+    return tokenCache.fingerprint(folder / "item1A") or {"digest": nearDuplicate.digest(ids),
+                                                         "minhash": nearDuplicate.minhash(ids)}
+
 def make_comps(cik):
     """
     
         Prepare consecutive 10-K Item 1A comparison pairs for a given cik.
 
     The function scans SEC_DIR/<ticker>/10-K/* and keeps only filings that
-    contain an extracted `item1A.txt`. It then orders filings by date and
+    contain an extracted Item 1A (`has_item1A`). It then orders filings by date and
     constructs consecutive pairwise comparisons.
 
     Returns list[dict]
@@ -70,7 +122,8 @@ def make_comps(cik):
     date_data = []
     folders_path = SEC_DIR / cik / "10-K"
     for i in folders_path.iterdir():
-        date_data.append(check_date(i) if (i / "item1A.txt").is_file() else None) 
+        if has_item1A(i):
+            date_data.append(check_date(i))
     
     ordered_filings = order_filings(date_data)
 
@@ -92,14 +145,18 @@ def concurrency_runner(writer, cik):
     The function prepares consecutive filing by using the 'make_comps' function
     then uses ProcessPoolExecutor to parallelize the similarity calculation across comparisons.
     The resulting dictionaries are written via `writer.writerows(model)` on a csv file.
+    Returns the triage of each comparison (see `triage`), for `triage_report`.
     """
-    model = []
+    model, triaged = [], []
     try:
         with ProcessPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            model = list(executor.map(process_comps, make_comps(cik), repeat(cik)))
+            for row, records in executor.map(_process_comps_triaged, make_comps(cik), repeat(cik)):
+                model.append(row)
+                triaged.extend(records)
             writer.writerows(model)
     except:
         print("Skipped")
+    return triaged
 
 
 
@@ -107,20 +164,75 @@ def concurrency_runner(writer, cik):
 
 
 
-def process_comps(comps, cik):
+def process_comps(comps, cik, records=None):
     """
     Compute similarity metrics for a single consecutive filing comparison.
 
-    Loads `item1A.txt` for two filings (newer vs older) and computes token-level
-    Levenshtein distance, similarity, and sentiment statistics for newly introduced
-    words (relative to the older filing).
+    Loads the Item 1A token IDs of two filings (newer vs older, see `item1A_tokens`) and
+    computes token-level Levenshtein distance, similarity, and sentiment statistics for
+    newly introduced words (relative to the older filing).
+    Identical texts are answered without computing anything (see `triage`); the
+    triage of the pair is appended to `records` if given.
     """
-    filingNew, filingOld = comps["filing1"], comps["filing2"]
-    fileNew = SEC_DIR / cik / "10-K" / filingNew / "item1A.txt"
-    fileOld = SEC_DIR / cik / "10-K" / filingOld / "item1A.txt"
-    textNew = fileNew.read_text(encoding="utf-8", errors="ignore")
-    textOld = fileOld.read_text(encoding="utf-8", errors="ignore")
-    return min_edit_similarity(textNew, textOld, comps, cik)
+    folderNew = SEC_DIR / cik / "10-K" / comps["filing1"]
+    folderOld = SEC_DIR / cik / "10-K" / comps["filing2"]
+    A, B = item1A_tokens(folderNew), item1A_tokens(folderOld)
+    kind = triage(A, B, item1A_fingerprint(folderNew, A), item1A_fingerprint(folderOld, B))
+    if records is not None:
+        records.append(kind)
+    if kind == "identical":
+        return identical_similarity(len(A), comps, cik)
+    return token_similarity(A.tolist(), B.tolist(), tokenCache.vocabulary().words, comps, cik,
+                            rewritten=kind == "rewritten")
+
+def _process_comps_triaged(comps, cik):
+    records = []
+    return process_comps(comps, cik, records), records
+
+# --------------------------------------------------------------------------------------------------------------------
+#                                                TRIAGE
+# --------------------------------------------------------------------------------------------------------------------
+# Many firms file the same Item 1A year after year. Before the edit distance, each pair is classified from the
+# fingerprints stored with the token IDs: equal digests (confirmed token by token) are "identical" and get
+# distance 0 and similarity 1 at once, as the full computation would; otherwise the MinHash estimate of the
+# shingle Jaccard similarity separates "near-duplicate" pairs, for which `editDistance.levenshtein` looks for
+# unchanged text, from "rewritten" ones (below NEAR_DUPLICATE_JACCARD), which go straight to the full pass.
+
+TRIAGE_KINDS = ("identical", "near-duplicate", "rewritten")
+
+def triage(A, B, fingerprint_a: dict, fingerprint_b: dict) -> str:
+    """
+    "identical", "near-duplicate" or "rewritten" for the token ID arrays `A` and `B`.
+    """
+    if fingerprint_a["digest"] == fingerprint_b["digest"] and np.array_equal(A, B):
+        return "identical"
+    if nearDuplicate.jaccard(fingerprint_a["minhash"], fingerprint_b["minhash"]) >= NEAR_DUPLICATE_JACCARD:
+        return "near-duplicate"
+    return "rewritten"
+
+def identical_similarity(n_tokens: int, dict, ticker):
+    """
+    `token_similarity` of a text with itself: no edits and no new words.
+    """
+    return {
+        "ticker": ticker,
+        "date_a": dict["date1"],
+        "date_b": dict["date2"],
+        "distance": 0,
+        "similarity": 1.0,
+        "len_a": n_tokens,
+        "len_b": n_tokens,
+        "sentiment": 0}
+
+def triage_report(records) -> str:
+    """
+    One line counting the compared pairs per triage kind.
+    """
+    counts = {kind: 0 for kind in TRIAGE_KINDS}
+    for kind in records:
+        counts[kind] += 1
+    return (f"Item 1A pairs: {len(records)} compared, {counts['identical']} identical (short-circuited), "
+            f"{counts['near-duplicate']} near-duplicate, {counts['rewritten']} rewritten")
 
 
 # --------------------------------------------------------------------------------------------------------------------
@@ -128,11 +240,13 @@ def process_comps(comps, cik):
 # --------------------------------------------------------------------------------------------------------------------
 
 
+_WORD_RE = re.compile(r"[A-Za-z']+")
+TOKENIZER_VERSION = hashlib.sha256(f"lower|{_WORD_RE.pattern}".encode()).hexdigest()[:16]  # keys the token cache
+
 def tokenize(text: str) -> list[str]:
     """
     Returns list of all elements in the string in lowercase.
     """
-    _WORD_RE = re.compile(r"[A-Za-z']+")
     return _WORD_RE.findall(text.lower())
 
 def mean_vader_compound(words) -> float:
@@ -147,71 +261,83 @@ def mean_vader_compound(words) -> float:
         compounds.append(scores["compound"])
     return sum(compounds) / len(compounds) if len(compounds) != 0 else 0
 
-def levenshtein_tokens(a_tokens, b_tokens, cik):
+def edit_words(a_ids, b_ids, words, aligned: bool = False):
     """
-    Compute token-level Levenshtein edit distance using a two-row dynamic program.
+    Words of A (newer filing) that are new relative to B (older filing), and words of B
+    that were removed, each computed once.
 
-    Implements Wagner-Fischer (edit distance) over token sequences. For memory
-    efficiency, the function ensures the second sequence is the shorter one.
+    By default by set membership: tokens of A absent from B and tokens of B absent from A.
+    With `aligned`, from an optimal edit script turning B into A (`editDistance.alignment`,
+    Hirschberg in linear memory): the inserted and substituted-in tokens of A and the
+    deleted and substituted-out tokens of B, i.e. the tokens an edit actually touches.
+    """
+    if not aligned:
+        a_set, b_set = set(a_ids), set(b_ids)
+        return [words[t] for t in a_ids if t not in b_set], [words[t] for t in b_ids if t not in a_set]
+    new_words, removed_words = [], []
+    for tag, i1, i2, j1, j2 in editDistance.alignment(b_ids, a_ids):
+        if tag != "equal":
+            removed_words.extend(words[t] for t in b_ids[i1:i2])
+            new_words.extend(words[t] for t in a_ids[j1:j2])
+    return new_words, removed_words
+
+def levenshtein_ids(a_ids, b_ids, words, cik, aligned: bool = NEW_WORDS_FROM_ALIGNMENT,
+                    max_distance: int | None = None, rewritten: bool = False):
+    """
+    Token-level Levenshtein edit distance between two sequences of token IDs, computed
+    with a bit-parallel algorithm (`editDistance.levenshtein`, Myers/Hyyro bit vectors),
+    which gives the same value as the Wagner-Fischer DP.
 
     Parameters
     ----------
-    a_tokens : list[str]
-        Tokens from document A (newer filing in your usage).
-    b_tokens : list[str]
-        Tokens from document B (older filing in your usage).
+    a_ids, b_ids : list[int]
+        Token IDs of document A (newer filing) and B (older filing).
+    words : list[str]
+        Token of each ID, used for the returned new words.
     cik : str
         Used only for progress printing.
+    aligned : bool
+        Derive the new words from the edit alignment instead of set membership (see `edit_words`).
+    max_distance : int | None
+        Stop as soon as the distance is known to exceed this value (see `editDistance.levenshtein`).
+    rewritten : bool
+        The texts share little (see `triage`): skip the search for unchanged text.
 
     Returns
     -------
-    tuple[int, list[str]]
+    tuple[int | None, list[str]]
         (distance, new_words) where:
           - distance is the Levenshtein edit distance between token sequences,
-          - new_words are tokens present in `a_tokens` but not in `b_tokens`
-            (set difference, not edit-alignment-based).
-
-    Notes
-    -----
-    The progress printing should be driven by the i/j loop. In the current code,
-    `j` is referenced outside its loop and `new_words` computation is indented
-    inside the outer loop; this should be corrected for clarity and correctness.
-    """
-    # m, n, a_tokens, b_tokens = n, m, b_tokens, a_tokens if n > m else None
-    m, n = len(a_tokens), len(b_tokens)
-    if n > m:
-        # ensure n <= m for memory efficiency
-        a_tokens, b_tokens = b_tokens, a_tokens
-        m, n = n, m
-    # SCrivi piu sinstetico
-    #
-    prev = list(range(n + 1))  # row 0..n
-    for i in range(1, m + 1):
-        cur = [i] + [0]*n
-        ai = a_tokens[i-1]
-        for j in range(1, n + 1):
-            cost = 0 if ai == b_tokens[j-1] else 1
-            cur[j] = min(
-                prev[j] + 1,      # deletion
-                cur[j-1] + 1,     # insertion
-                prev[j-1] + cost  # substitution (0 if match)
-            )
-
-        if (j % 1000 == 0) or (j == n):  # adjust 1000 for your speed/verbosity
-            done_cells = (i - 1) * n + j
-            total_cells = m * n
-            pct = (done_cells / total_cells) * 100 if total_cells else 100.0
-            sys.stdout.write(f"\rCik: {cik} Progress: {pct:6.2f}%  (row {i}/{m}, col {j}/{n})")
-            sys.stdout.flush()
-
-        b_set = set(b_tokens)
-        new_words = [t for t in a_tokens if t not in b_set]
-    # after both loops finish:
-        print()
-        prev = cur
-    return prev[n], new_words
-
-def min_edit_similarity(text_a: str, text_b: str, dict, ticker):
+            or None if it exceeds `max_distance`,
+          - new_words are the tokens of A new relative to B (see `edit_words`); by set
+            difference when the distance exceeds `max_distance`, which the alignment would
+            cost as much as the full distance to find.
+    """
+    def progress(i, m):
+        sys.stdout.write(f"\rCik: {cik} Progress: {i / m * 100:6.2f}%  (row {i}/{m})")
+        sys.stdout.flush()
+
+    distance = editDistance.levenshtein(a_ids, b_ids, progress, max_distance, rewritten)
+    print()
+    if distance is None:                                                        # over max_distance: no alignment
+        aligned = False
+    new_words, _ = edit_words(a_ids, b_ids, words, aligned)
+    return distance, new_words
+
+def levenshtein_tokens(a_tokens, b_tokens, cik):
+    """
+    `levenshtein_ids` on token strings, interned to IDs for this pair.
+    """
+    vocab, (a_ids, b_ids) = editDistance.intern(a_tokens, b_tokens)
+    return levenshtein_ids(a_ids, b_ids, list(vocab), cik)
+
+def max_distance_for(min_similarity: float, len_a: int, len_b: int) -> int:
+    """
+    Largest distance whose similarity, 1 - dist / (len_a + len_b), is still >= `min_similarity`.
+    """
+    return max(int((1.0 - min_similarity) * (len_a + len_b) + 1e-9), 0)
+
+def min_edit_similarity(text_a: str, text_b: str, dict, ticker, max_distance: int | None = None):
     """
     Compute disclosure-change features from two texts using edit distance and sentiment.
 
@@ -232,20 +358,32 @@ def min_edit_similarity(text_a: str, text_b: str, dict, ticker):
         Metadata dict containing "date1" and "date2".
     ticker : str
         Firm identifier, stored in output and used for progress printing.
+    max_distance : int | None
+        For threshold-only questions (e.g. `max_distance_for(0.7, ...)` for "is the
+        similarity below 0.7"): the distance is computed exactly when it is at most
+        `max_distance`, and the computation stops early otherwise.
 
     Returns
     -------
     dict
         Dictionary containing:
           - ticker, date_a, date_b,
-          - distance (int), similarity (float),
+          - distance (int), similarity (float); when the distance exceeds `max_distance`,
+            distance is None and similarity is the upper bound 1 - (max_distance + 1) / (len(A) + len(B)),
           - len_a, len_b (token counts),
           - sentiment (float): mean compound score of newly introduced words.
     """
-    A, B = tokenize(text_a), tokenize(text_b)
-    dist, new_words = levenshtein_tokens(A, B, ticker)
+    vocab, (A, B) = editDistance.intern(tokenize(text_a), tokenize(text_b))
+    return token_similarity(A, B, list(vocab), dict, ticker, max_distance)
+
+def token_similarity(A, B, words, dict, ticker, max_distance: int | None = None, rewritten: bool = False):
+    """
+    `min_edit_similarity` on token ID sequences `A` and `B`; `words` maps IDs to tokens.
+    """
+    dist, new_words = levenshtein_ids(A, B, words, ticker, max_distance=max_distance, rewritten=rewritten)
     denom = len(A) + len(B)
-    sim = 1.0 - (dist / denom if denom else 0.0)
+    bound = dist if dist is not None else max_distance + 1
+    sim = 1.0 - (bound / denom if denom else 0.0)
     return {
         "ticker": ticker, 
         "date_a": dict["date1"], 
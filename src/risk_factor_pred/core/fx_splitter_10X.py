@@ -1,8 +1,13 @@
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional
-from itertools import islice
+from bisect import bisect_right
+import os
 import re
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from risk_factor_pred.consts import ITEM_STORAGE
+from . import storage, htmlCleaner, itemIndex
+from .timeBudget import TimeBudget
 
 def _normalize_ws(s: str) -> str:
     """
@@ -32,8 +37,12 @@ def item_dict_builder(path):
         # Must add 'Item <num> and <num>.'
     Consecutive duplicate item tokens are removed (deduped) to reduce noise.
     """
+    return item_dict_from_text(storage.read_text(path, encoding="utf-8", errors="ignore"))
 
-    text = path.read_text(encoding="utf-8", errors="ignore")
+def item_dict_from_text(text: str):
+    """
+    `item_dict_builder` on text already in memory.
+    """
     out = []
     HEAD_RE = re.compile(r'^\s*(?P<kind>items?)\b\s*(?P<rest>[0-9].*)$', re.IGNORECASE)                                # Regex to find lines to split
 
@@ -51,7 +60,12 @@ def item_dict_builder(path):
             'line_no': i,
         })
 
-    # dedupe consecutive duplicates
+    return _dedupe(out)
+
+def _dedupe(out):
+    """
+    Drop entries whose item token repeats the previous one (case-insensitive).
+    """
     deduped = []
     last = None
     for row in out:
@@ -66,31 +80,20 @@ def number_of_rounds(item_dict, bool):
     Extract numeric item components and estimate how many full 'rounds' of items exist.
 
     For each entry in `item_dict:` list[dict], extracts only digits from the `item_n` field and
-    converts them to integers. 
-    Then estimates the number of repeated "rounds" of the table-of-contents items by
-    counting occurrences of `max_num` and `max_num - 1`.
+    converts them to integers, dropping numbers above 20 (e.g. "Item 400").
+    Then estimates the number of repeated "rounds" of the table-of-contents items as the
+    number of occurrences of `max_num - 1` (the count the former list comparison between
+    the `max_num` and `max_num - 1` occurrences always picked).
     """
-    out = []
-    for items in item_dict:
-        digits = "".join(ch for ch in items.get("item_n") if ch.isdigit() and ch)
-        out.append(digits)
-    listAllItems = [int(i) for i in out]
+    listAllItems = [int("".join(ch for ch in items.get("item_n") if ch.isdigit())) for items in item_dict]
 
     # sometimes "Item 400" exists
-    while max(listAllItems) > 20:
-        listAllItems.remove(max(listAllItems))
-    
+    listAllItems = [i for i in listAllItems if i <= 20]
     max_num = max(listAllItems)
 
-    # Double check the number of rounds is correct
-    rounds = [i for i in listAllItems if i==max_num]
-    rounds2 = [i for i in listAllItems if i==max_num-1]
-    rounds = rounds2 if rounds > rounds2 else rounds
-    
     if bool == True:
-        return len(rounds)
+        return listAllItems.count(max_num - 1)
     else:
-        print(listAllItems)
         return listAllItems
 
 def table_content_builder(item_dict):
@@ -110,6 +113,17 @@ def table_content_builder(item_dict):
             tableContent.append(n + l)    
     return tableContent
 
+def _label_index(item_dict):
+    """
+    Map each 'item_n' to the (line numbers, rows) of its headings, in `item_dict` order.
+    """
+    index = {}
+    for r in item_dict:
+        lines, rows = index.setdefault(r.get('item_n'), ([], []))
+        lines.append(r.get('line_no'))
+        rows.append(r)
+    return index
+
 def final_list(tableContent, item_dict):
     """
     Makes a list of dict that contains the actual items
@@ -117,19 +131,25 @@ def final_list(tableContent, item_dict):
     First, builds multiple candidate sequences of item headings by scanning in item_dict.
     Secondly, Selects the candidate that is most probably the item list
 
+    `item_dict` must be ordered by line number (as built by `item_dict_builder`): for each
+    label, the first heading after the previous pick is found by bisection in a
+    label -> line numbers index instead of rescanning `item_dict`.
+
     Returns list[dict]: The selected sequence (list of dicts with 'Item number' and 'Item line').
     """
-
+    index = _label_index(item_dict)
     list_lines = []
     last_ele = 0
     for _ in range(number_of_rounds(item_dict, bool=True)):
         lines = []
         for itemTC in tableContent:
-            for r in item_dict:
-                if itemTC == r.get('item_n') and r.get('line_no') > last_ele:
-                    lines.append(r)
-                    last_ele = r['line_no']
-                    break
+            entry = index.get(itemTC)
+            if entry is None:
+                continue
+            k = bisect_right(entry[0], last_ele)
+            if k < len(entry[0]):
+                lines.append(entry[1][k])
+                last_ele = entry[0][k]
         list_lines.append(lines)
 
     diff = 0
@@ -140,13 +160,13 @@ def final_list(tableContent, item_dict):
             diff = n
     return list_lines[num]
 
-def print_items(filepath, final_split, p):
+def print_items(filepath, final_split, p, in_memory: bool = False):
     """
     Write per-item text files by slicing the input document between detected item headings.
 
-    For each entry in `final_split`, this function:
-      - takes the line range from its `line_no` to the next item heading's `line_no`,
-      - writes the extracted chunk to `p/item<ITEM>.txt` (e.g., item1A.txt).
+    The file is streamed once: each line goes to the item whose heading is the last one
+    at or before it, so every item runs from its `line_no` to the next heading's `line_no`
+    and the last one to the end of the file. Lines before the first heading are skipped.
 
     Parameters
     ----------
@@ -156,37 +176,44 @@ def print_items(filepath, final_split, p):
         Selected sequence of headings (output of `final_list`), containing 'item_n' and 'line_no'.
     p : pathlib.Path
         Output directory where item files will be written (typically the filing folder).
+    in_memory : bool
+        If True, nothing is written and the item texts are returned instead.
 
     Returns
     -------
-    None
+    dict[str, str] | None
+        With `in_memory`, maps 'item_n' (e.g., "1A") to the item's text.
 
     Side Effects
     ------------
-    Writes multiple `item*.txt` files to disk.
-
-    Notes
-    -----
-    The function currently appends a hard-coded terminal line number (11849) as the
-    end boundary. This should ideally be replaced by the actual file length to
-    avoid truncation or out-of-range assumptions.
-    """
-    page_list = [i['line_no'] for i in final_split]
-    page_list.append(11849)
-
-    for n, i in enumerate(final_split):
-        start, end = page_list[n], page_list[n+1]
-        with filepath.open("r", encoding="utf-8", errors="replace") as f:
-            lines = list(islice(f, start - 1, end-1))
-        chunk = "".join(lines)
-        filename = f"item{i['item_n']}.txt"
-
-        full_path = p / filename
-        with open(full_path, "w", encoding='utf-8') as f:
-            f.write(chunk)
+    Without `in_memory`, writes one `p/item<ITEM>.txt` file per item (e.g., item1A.txt).
+    """
+    bounds = [(i['item_n'], i['line_no']) for i in final_split]
+    items = {}
+    chunk = []
+    k = -1                                                                      # index of the item being filled
+    with storage.open_text(filepath, "r", encoding="utf-8", errors="replace") as f:
+        for line_no, line in enumerate(f, start=1):
+            while k + 1 < len(bounds) and line_no >= bounds[k + 1][1]:
+                if k >= 0:
+                    items[bounds[k][0]] = "".join(chunk)
+                chunk = []
+                k += 1
+            if k >= 0:
+                chunk.append(line)
+    while k < len(bounds):                                                      # headings past the last line are empty
+        if k >= 0:
+            items[bounds[k][0]] = "".join(chunk)
+        chunk = []
+        k += 1
+
+    if in_memory:
+        return items
+    for item_n, chunk in items.items():
+        storage.write_text(p / f"item{item_n}.txt", chunk)
     print("okkkkk")
 
-def version2(path, p):
+def version2(path, p, in_memory: bool = False, as_index: bool = False):
     """
     End-to-end item-splitting routine for a single filing text file.
 
@@ -204,10 +231,15 @@ def version2(path, p):
         Path to the cleaned filing text file (e.g., clean-full-submission.txt).
     p : pathlib.Path
         Output directory where per-item files will be written.
+    in_memory : bool
+        If True, return the item texts instead of writing them (see `print_items`).
+    as_index : bool
+        If True, write no item files but one offset sidecar for `path` (see `itemIndex`)
+        and return it.
 
     Returns
     -------
-    None
+    dict | None
 
     Side Effects
     ------------
@@ -215,33 +247,179 @@ def version2(path, p):
     """
     item_dict = item_dict_builder(path)                                                       # Make list of dict indicating all item n. and line n. for each item 
     tableContent = table_content_builder(item_dict)
-    print_items(path, final_list(tableContent, item_dict), p)
-    time.sleep(0.5)
+    final_split = final_list(tableContent, item_dict)
+    if as_index:
+        return itemIndex.build(path, final_split)
+    return print_items(path, final_split, p, in_memory)
 
-def try_exercize(p):
+def try_exercize(p, storage_mode: str = ITEM_STORAGE):
     """
-    Attempt to split a single filing into per-item text files, swallowing failures.
+    Attempt to split a single filing into per-item text files, without raising.
 
-    Constructs the expected cleaned filing path `p/clean-full-submission.txt` and runs
-    `version2(...)`. If any exception occurs, prints "failed" and returns.
+    Constructs the expected cleaned filing path `p/full-submission.txt` and runs
+    `version2(...)`. With `storage_mode` "index" the items are recorded in an offset
+    sidecar instead of item files (see `ITEM_STORAGE`).
 
     Parameters
     ----------
     p : pathlib.Path
-        Filing directory containing `clean-full-submission.txt`.
+        Filing directory containing the cleaned `full-submission.txt`.
 
     Returns
     -------
-    None
-
-    Notes
-    -----
-    Catching all exceptions with a bare `except:` makes debugging difficult and can
-    hide real errors. Consider catching `Exception as e` and printing/logging `e`.
+    dict
+        Per-filing record: 'filing', 'ok', 'error' (repr of the exception or None),
+        'bytes' (on-disk size of the filing), 'seconds' and 'pid' of the worker process.
     """
     filepath = p / "full-submission.txt"
+    t0 = time.perf_counter()
+    record = {"filing": str(p), "ok": True, "error": None, "bytes": 0}
     try:
-        version2(filepath, p)
-    except:
-        print("failed")
-    return
\ No newline at end of file
+        record["bytes"] = storage.size(filepath)
+        version2(filepath, p, as_index=storage_mode == "index")
+    except Exception as e:
+        record["ok"], record["error"] = False, repr(e)
+    record["seconds"] = time.perf_counter() - t0
+    record["pid"] = os.getpid()
+    return record
+
+# --------------------------------------------------------------------------------------------------------------------
+#                                                BATCH SPLITTING
+# --------------------------------------------------------------------------------------------------------------------
+# Splitting time grows with the filing size, and filings range from a few KB to 50+ MB. Submitting them in
+# directory order one by one leaves most workers idle while the last large filings finish, so they are
+# submitted largest-first and small filings are grouped into chunks of similar total size.
+
+CHUNKS_PER_WORKER = 8                                                           # target chunks per worker
+
+def size_chunks(paths, workers: int):
+    """
+    Order filing folders largest-first by the size of their `full-submission.txt` and group
+    them into chunks of about total / (workers * CHUNKS_PER_WORKER) bytes; a filing larger
+    than that forms its own chunk.
+    """
+    sized = []
+    for p in paths:
+        path = Path(p) / "full-submission.txt"
+        sized.append((storage.size(path) if storage.exists(path) else 0, p))
+    sized.sort(key=lambda t: t[0], reverse=True)
+    target = max(sum(n for n, _ in sized) / max(workers * CHUNKS_PER_WORKER, 1), 1)
+
+    chunks, chunk, total = [], [], 0
+    for n, p in sized:
+        chunk.append(p)
+        total += n
+        if total >= target:
+            chunks.append(chunk)
+            chunk, total = [], 0
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+def split_chunk(paths, storage_mode: str = ITEM_STORAGE):
+    """
+    Run `try_exercize` on each filing of a chunk and return the records.
+    """
+    return [try_exercize(p, storage_mode) for p in paths]
+
+def split_many(paths, max_workers: int, storage_mode: str = ITEM_STORAGE):
+    """
+    Split the filing folders `paths` in a process pool, largest first (`size_chunks`),
+    yielding one `try_exercize` record per filing as its chunk completes.
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(split_chunk, chunk, storage_mode) for chunk in size_chunks(paths, max_workers)]
+        for future in as_completed(futures):
+            yield from future.result()
+
+def utilization_report(records, wall: float, workers: int) -> list:
+    """
+    Summary lines for `split_many` records: successes/failures, and busy time and
+    utilization (busy / wall-clock seconds) per worker process and overall.
+    """
+    busy = {}
+    for r in records:
+        busy[r["pid"]] = busy.get(r["pid"], 0.0) + r["seconds"]
+    failed = sum(1 for r in records if not r["ok"])
+    wall = max(wall, 1e-9)
+    lines = [f"{len(records)} filings ({failed} failed) in {wall:.1f}s with {workers} workers, "
+             f"utilization {sum(busy.values()) / (wall * workers):.0%}"]
+    for pid, seconds in sorted(busy.items()):
+        lines.append(f"  worker {pid}: busy {seconds:.1f}s ({seconds / wall:.0%})")
+    return lines
+
+# --------------------------------------------------------------------------------------------------------------------
+#                                                ITEM 1A ONLY
+# --------------------------------------------------------------------------------------------------------------------
+# The similarity stage only reads item1A.txt. Instead of cleaning the whole filing, the headings are located on
+# the raw primary document, where every tag counts as a line break (most of them become one in `clean_html`),
+# the section is chosen with the same TOC-round logic (`table_content_builder` + `final_list`) using character
+# offsets as line numbers, and only the raw slice from the Item 1A heading to the next selected heading is cleaned.
+
+_RAW_GAP = r'(?:\s|&nbsp;|&#160;|&#xa0;|<[^<>]*>)*'                              # whitespace, tags and nbsp entities
+_RAW_ITEM = re.compile(r'items?\b' + _RAW_GAP + r'(\d[^\s.&<]*)(' + _RAW_GAP + r'\.)?', re.IGNORECASE)
+_RAW_LEAD = re.compile(r'(?:\s|&nbsp;|&#160;|&#xa0;)*', re.IGNORECASE)
+
+def raw_item_dict(raw: str):
+    """
+    `item_dict_builder` on raw markup: 'Item <number>' at the start of a line or right
+    after a tag, or followed by a dot anywhere (where `break_on_item_heads` would start
+    a line). `line_no` holds the character offset of the heading in `raw`.
+    """
+    out = []
+    for m in _RAW_ITEM.finditer(raw):
+        start = m.start()
+        if m.group(2) is None:
+            lead = max(raw.rfind(">", 0, start), raw.rfind("\n", 0, start)) + 1
+            if _RAW_LEAD.fullmatch(raw, lead, start) is None:
+                continue
+        out.append({
+            'item_n': before_dot(m.group(1)).upper(),
+            'line_no': start,
+        })
+    return _dedupe(out)
+
+def item1A_bounds(raw: str):
+    """
+    Return the (start, end) offsets of the Item 1A section in `raw`, or None if the
+    selected item sequence has no Item 1A or no item sequence can be selected (too few
+    headings, e.g. a lone "Item 1A").
+    """
+    item_dict = raw_item_dict(raw)
+    if not item_dict:
+        return None
+    try:
+        split = final_list(table_content_builder(item_dict), item_dict)
+    except (ValueError, IndexError, UnboundLocalError):
+        return None
+    for n, row in enumerate(split):
+        if row['item_n'] == "1A":
+            end = split[n + 1]['line_no'] if n + 1 < len(split) else len(raw)
+            return row['line_no'], end
+    return None
+
+def extract_item1A(p, raw_name: str = "full-submission.txt", budget: TimeBudget | None = None,
+                   records: list | None = None):
+    """
+    Write `p/item1A.txt` by cleaning only the Item 1A slice of the filing's primary document.
+
+    Returns the path written, or None when the section cannot be located, in which
+    case the caller should clean and split the whole filing instead. With a `budget`,
+    cleaning the slice may raise `BudgetExceeded` (see `htmlCleaner.clean_html`).
+    When `records` is given, (format, bytes, seconds) of the cleaned slice is appended.
+    """
+    t0 = time.perf_counter()
+    raw = htmlCleaner.read_primary_document(Path(p) / raw_name)
+    bounds = item1A_bounds(raw)
+    if bounds is None:
+        return None
+    start, end = bounds
+    fmt, text = htmlCleaner.clean_document(raw[start:end], budget, fmt=htmlCleaner.sniff_format(raw))
+    text = htmlCleaner.cleaning_items(text)
+    if not text.strip():
+        return None
+    if records is not None:
+        records.append((fmt, end - start, time.perf_counter() - t0))
+    full_path = Path(p) / "item1A.txt"
+    storage.write_text(full_path, text + "\n")
+    return full_path
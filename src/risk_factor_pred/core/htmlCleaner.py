@@ -1,7 +1,13 @@
-from risk_factor_pred.consts import SEC_DIR
+from risk_factor_pred.consts import SEC_DIR, QUARANTINE_PATH, CLEAN_FILING_BUDGET, CLEAN_STAGE_BUDGET
 import re
 from typing import List
 import os
+import html
+import io
+import json
+from datetime import datetime, timezone
+from . import cleanCache, documentIndex, htmlTokenizer, storage
+from .timeBudget import TimeBudget, BudgetExceeded
 
 # --------------------------------------------------------------------------------------------------------------------
 #                                              REGEX FOR HTML CLEANING
@@ -140,22 +146,52 @@ def remove_part_1(html_content): # Cleans comments, tables, img, span
 
     return html_content
 
-def loop_clean(html_content):
+_EMPTY_P = re.compile(r'<p>\s*</p>', re.DOTALL | re.IGNORECASE)
+_EMPTY_DIV = re.compile(r'<div>\s*</div>', re.IGNORECASE)
+_EMPTY_TAG_RUN = re.compile(r'<(?:p|div)>(?:\s*</?(?:p|div)>)+', re.IGNORECASE)
+
+def _collapse_empty_run(match):
     """
-    Iteratively remove empty <p>...</p> and <div>...</div> tags until stable.
+    Drop the empty elements of a run of <p>/<div> tags separated only by whitespace.
+
+    A stack holds the open tags whose content is blank so far; a matching close tag
+    drops everything written since its open tag, any other close tag empties the stack.
+    In a run, a tag's length tells p from div whatever its case.
     """
-    p_pattern = re.compile(r'<p>\s*</p>', re.DOTALL | re.IGNORECASE)
-    div_pattern = re.compile(r'<div>\s*</div>', re.IGNORECASE)
-    while True:
-        pre_cleaning_content = html_content
-        
-        html_content = re.sub(p_pattern, '', html_content)
-        html_content = re.sub(div_pattern, '', html_content)
+    out = []
+    append = out.append
+    stack = []                                                                  # (len of the matching "</p" / "</div", len(out))
+    for piece in match.group().split(">")[:-1]:                                 # "<p", "\n</div", ...
+        if piece[0] == "<":
+            tag = piece
+        else:
+            tag = piece.lstrip()
+            append(piece[:len(piece) - len(tag)])                               # whitespace before the tag
+        if tag[1] != "/":
+            stack.append((len(tag) + 1, len(out)))
+        elif stack and stack[-1][0] == len(tag):
+            del out[stack.pop()[1]:]
+            continue
+        else:
+            stack.clear()
+        append(tag)
+        append(">")
+    return "".join(out)
 
-        if html_content == pre_cleaning_content:
-            break
+def loop_clean(html_content):
+    """
+    Remove empty <p>...</p> and <div>...</div> tags, including nested ones.
 
-    return html_content
+    One `<p>\s*</p>` / `<div>\s*</div>` substitution pass removes the innermost level,
+    which is all most filings have. If empty elements are left (nested ones), a single
+    stack-based sweep over the runs of these tags removes every remaining level, with
+    the result of repeating the pass until stable but in time linear in the document.
+    """
+    html_content = _EMPTY_P.sub('', html_content)
+    html_content = _EMPTY_DIV.sub('', html_content)
+    if not (_EMPTY_P.search(html_content) or _EMPTY_DIV.search(html_content)):
+        return html_content
+    return _EMPTY_TAG_RUN.sub(_collapse_empty_run, html_content)
 
 def remove_numeric_entities(s: str) -> str:
     """
@@ -300,14 +336,13 @@ def break_on_item_heads(text: str) -> str:
     s = ''.join(out)                     # <-- join the list!
     return re.sub(r'[ \t]+\n', '\n', s)  # tidy spaces before newlines
 
-def clean_html(file_content):
+def clean_markup_regex(cleaned):
     """
-    Perform end-to-end HTML-to-text cleaning for SEC filing content.
+    Reference multi-pass version of the markup cleaning: one regex pass per rule.
+
+    `htmlTokenizer.clean_markup` produces the same output in a single traversal;
+    this version is kept as the fallback for markup it does not support.
     """
-    cleaned = soft_unwrap_html_lines(file_content)
-    cleaned = get_from_sec_document(cleaned)
-    
-    cleaned = get_content_before_sequence(cleaned)                          # cuts after <SEQUENCE>2
     cleaned = remove_head_with_regex(cleaned)
     
     cleaned = remove_style_with_regex(cleaned)
@@ -323,19 +358,188 @@ def clean_html(file_content):
     cleaned = prepend_newline_to_p(cleaned)
 
     cleaned = strip_all_html_tags(cleaned)
-    cleaned = remove_numeric_entities(cleaned)
-    cleaned = break_on_item_heads(cleaned)
-    cleaned = clean_lines(cleaned)
+    return remove_numeric_entities(cleaned)
+
+def _markup(cleaned):
+    try:
+        return htmlTokenizer.clean_markup(cleaned)                          # single pass over the tags
+    except htmlTokenizer.UnsupportedMarkup:
+        return clean_markup_regex(cleaned)
+
+def _primary_text(cleaned):
+    cleaned = get_from_sec_document(cleaned)
+    return get_content_before_sequence(cleaned)                             # cuts after <SEQUENCE>2
+
+def _unbudgeted(stage, func, *args):
+    return func(*args)
+
+def clean_html(file_content, budget: TimeBudget | None = None):
+    """
+    Perform end-to-end HTML-to-text cleaning for SEC filing content.
+
+    With a `budget`, every step runs as a budgeted stage and may raise `BudgetExceeded`.
+    """
+    run = budget.run if budget is not None else _unbudgeted
+    cleaned = run("unwrap", soft_unwrap_html_lines, file_content)
+    cleaned = run("primary_document", _primary_text, cleaned)
+    cleaned = run("markup", _markup, cleaned)
+    cleaned = run("item_heads", break_on_item_heads, cleaned)
+    cleaned = run("lines", clean_lines, cleaned)
     return cleaned
 
-def print_clean_txt(html_content):
+# --------------------------------------------------------------------------------------------------------------------
+#                                              FALLBACK CLEANER
+# --------------------------------------------------------------------------------------------------------------------
+# Used when a filing exhausts its time budget. Every step is linear in the input: no lazy `.*?` spanning the
+# document, no backreferences and no leading `\s*` in front of the item-heading pattern.
+
+_FALLBACK_TAG = re.compile(r'<(?=[^<>]*>)(/?)([^<>\s/]*)[^<>]*>')               # lookahead: no retries on '<' without '>'
+_FALLBACK_BLOCK_TAGS = {"p", "div", "br", "tr", "table", "li", "center", "h1", "h2", "h3", "h4", "h5", "h6"}
+_FALLBACK_ITEM_HEAD = re.compile(r'(?<=[^\n])\b(items?\b[ \t]*\d+[A-Za-z]?[ \t]*\.)', re.IGNORECASE)
+
+def _drop_blocks(text: str, start: str, end: str) -> str:
+    """
+    Remove every `start`...`end` block (case-insensitive) with plain string searches.
+    """
+    lower = text.lower()
+    if len(lower) != len(text):                                             # offsets would not line up
+        return text
+    out, pos = [], 0
+    while (i := lower.find(start, pos)) != -1:
+        j = lower.find(end, i + len(start))
+        if j == -1:
+            break
+        out.append(text[pos:i])
+        pos = j + len(end)
+    out.append(text[pos:])
+    return "".join(out)
+
+def _fallback_tag(m):
+    return "\n" if (m.group(2) or "").lower() in _FALLBACK_BLOCK_TAGS else ""
+
+def clean_html_fallback(file_content):
+    """
+    Cheap, linear-time cleaning for filings that exceeded their time budget.
+
+    Keeps the primary document, drops comments, <head> and inline XBRL header blocks,
+    turns block-level tags into newlines, strips the other tags, decodes entities and
+    puts 'Item N.' headings on their own line. Coarser than `clean_html`, but bounded.
+    """
+    text = file_content
+    sec = text.find("<SEC-DOCUMENT>")
+    if sec != -1:
+        text = text[sec:]
+    seq = text.find("<SEQUENCE>2")
+    if seq != -1:
+        text = text[:seq]
+    text = _drop_blocks(text, "<!--", "-->")
+    text = _drop_blocks(text, "<head>", "</head>")
+    text = _drop_blocks(text, "<ix:header>", "</ix:header>")
+    text = _FALLBACK_TAG.sub(_fallback_tag, text)
+    text = html.unescape(text).replace("\xa0", " ")
+    text = _FALLBACK_ITEM_HEAD.sub(r"\n\1", text)
+    return clean_lines(text)
+
+def read_primary_document(path, chunk_size: int = 1 << 20) -> str:
+    """
+    Read a full submission only up to its primary document.
+
+    The file is streamed in chunks and reading stops at the end of the line holding
+    the first '<SEQUENCE>2' after '<SEC-DOCUMENT>', so exhibits, XBRL and graphics are
+    never loaded. `clean_html` cuts there anyway, so its output is unchanged; without
+    '<SEC-DOCUMENT>' the whole file is read, as before. When the submission has a
+    document index the cut is read directly from it.
+    """
+    text = documentIndex.primary_document(path)
+    if text is not None:
+        return text
+
+    text = ""
+    sec = seq = -1
+    with storage.open_text(path, encoding='utf-8') as f:
+        while chunk := f.read(chunk_size):
+            scanned = len(text)
+            text += chunk
+            if sec == -1:
+                sec = text.find("<SEC-DOCUMENT>", max(0, scanned - len("<SEC-DOCUMENT>")))
+                if sec == -1:
+                    continue
+                scanned = sec
+            if seq == -1:
+                seq = text.find("<SEQUENCE>2", max(sec, scanned - len("<SEQUENCE>2")))
+            if seq != -1:
+                eol = text.find("\n", seq)
+                if eol != -1:
+                    return text[:eol + 1]
+    return text
+
+# --------------------------------------------------------------------------------------------------------------------
+#                                              PLAIN-TEXT FILINGS
+# --------------------------------------------------------------------------------------------------------------------
+# Many 2006-2010 submissions carry their 10-K as plain text inside the SGML envelope. The HTML passes only cost
+# time on them and `strip_all_html_tags` deletes anything between a '<' and the next '>' (e.g. "<5%" ... ">10%"),
+# so they take a lightweight path that only removes the uppercase SGML markers (<PAGE>, <S>, <C>, <TYPE>, ...).
+
+_SNIFF_WINDOW = 1 << 16                                                 # chars of the primary <TEXT> inspected
+_HTML_MARKER = re.compile(r'<(?:html|body|head|p|div|font|span|br|hr|tr|td|b|i|u|a|center|img)[\s>/]'
+                          r'|<table\s|&nbsp;|&#\d+;', re.IGNORECASE)
+_SGML_TAG = re.compile(r'</?[A-Z][A-Z0-9\-]*>')
+
+def sniff_format(file_content: str) -> str:
+    """
+    Return "html" or "text" for the primary document of a submission, by looking for
+    HTML markup at the start of its first <TEXT> block (or of the content without one).
+    """
+    start = file_content.find("<TEXT>")
+    start = 0 if start == -1 else start + len("<TEXT>")
+    return "html" if _HTML_MARKER.search(file_content, start, start + _SNIFF_WINDOW) else "text"
+
+def strip_sgml_tags(text_content):
+    """
+    Remove EDGAR SGML markers (uppercase tags without attributes), leaving any other '<' text.
+    """
+    return _SGML_TAG.sub('', text_content)
+
+def clean_text(file_content, budget: TimeBudget | None = None):
+    """
+    Lightweight counterpart of `clean_html` for plain-text filings: keeps the original
+    line structure and only removes the SGML markers before the item-heading breaks.
+    """
+    run = budget.run if budget is not None else _unbudgeted
+    cleaned = run("primary_document", _primary_text, file_content)
+    cleaned = run("markup", strip_sgml_tags, cleaned)
+    cleaned = run("item_heads", break_on_item_heads, cleaned)
+    cleaned = run("lines", clean_lines, cleaned)
+    return cleaned
+
+def clean_document(file_content, budget: TimeBudget | None = None, fmt: str | None = None):
+    """
+    Clean a submission with `clean_html` or `clean_text` according to its format
+    (`sniff_format` unless `fmt` is given). Returns (format, cleaned text).
+    """
+    fmt = fmt or sniff_format(file_content)
+    return fmt, (clean_text if fmt == "text" else clean_html)(file_content, budget)
+
+def format_report(records) -> list:
+    """
+    One line per format for (format, bytes, seconds) records: filings, MB, time and MB/s.
+    """
+    totals = {}
+    for fmt, nbytes, seconds in records:
+        t = totals.setdefault(fmt, [0, 0, 0.0])
+        t[0] += 1
+        t[1] += nbytes
+        t[2] += seconds
+    return [f"{fmt}: {n} filings, {nbytes / 1e6:.1f} MB in {seconds:.1f}s -> {nbytes / 1e6 / max(seconds, 1e-9):.2f} MB/s"
+            for fmt, (n, nbytes, seconds) in sorted(totals.items())]
+
+def print_clean_txt(html_content, budget: TimeBudget | None = None):
     """
     Load a filing, clean it, and return the cleaned text.
     """
     try:
-        with open(html_content, 'r', encoding='utf-8') as file:
-            file_content = file.read()
-        cleaned = clean_html(file_content)
+        file_content = read_primary_document(html_content)
+        cleaned = clean_document(file_content, budget)[1]
     except FileNotFoundError:
         print(f"Error: The file '{html_content}' was not found.")
     return cleaned
@@ -345,14 +549,64 @@ def print_clean_txt(html_content):
 #                                                Cleaning 'Items'
 # --------------------------------------------------------------------------------------------------------------------
 
+_LINE_BREAK = re.compile(r'\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]')  # the boundaries of str.splitlines
+_ITEM_NO_SPACE = re.compile(r'\b(Items?)\b(?=\S)')
+_ITEM_NUMBER = re.compile(r'Item\s+\d+')
+_LETTER_DOT = re.compile(r'[A-Za-z]\.')
+
+def iter_lines(text: str):
+    """
+    Lazily yield the same lines as `text.splitlines()`, without building the list.
+    """
+    last = 0
+    for m in _LINE_BREAK.finditer(text):
+        yield text[last:m.start()]
+        last = m.end()
+    if last < len(text):
+        yield text[last:]
+
 def cleaning_items(html_content):
     """
     Normalize broken 'Item' headings that are split across lines.
-    """
-    html_content = merge_I_tem(html_content)
-    html_content = ensure_space_after_item(html_content)
-    html_content = merge_item_with_number_line(html_content)
-    return merge_item_number_with_suffix(html_content)
+
+    The four rules below are chained as line generators, each looking one line ahead,
+    so the text is traversed once and no intermediate list of lines is built.
+    """
+    lines = _merge_I_tem_lines(iter_lines(html_content))
+    lines = _ensure_space_after_item_lines(lines)
+    lines = _merge_item_with_number_lines(_resplit(lines))
+    lines = _merge_item_number_with_suffix_lines(_resplit(lines))
+    out = io.StringIO()
+    for line in lines:
+        out.write(line)
+        out.write("\n")
+    return out.getvalue()[:-1]
+
+def _resplit(lines):
+    """
+    Drop a trailing empty line, as joining the lines and splitting them again would.
+    """
+    prev = None
+    for line in lines:
+        if prev is not None:
+            yield prev
+        prev = line
+    if prev:
+        yield prev
+
+def _merge_I_tem_lines(lines):
+    prev = None
+    for line in lines:
+        if prev is None:
+            prev = line
+        elif prev.strip() == "I" and line.lstrip().startswith("tem"):
+            yield "I" + line.lstrip()                                           # e.g. "Item 1. ..."
+            prev = None
+        else:
+            yield prev
+            prev = line
+    if prev is not None:
+        yield prev
 
 def merge_I_tem(content: str) -> str: # Finds lines with 'I' & next line starts with 'tem' then merge them
     """
@@ -363,24 +617,11 @@ def merge_I_tem(content: str) -> str: # Finds lines with 'I' & next line starts
       Line i+1: "tem 1. Business"
       -> "Item 1. Business"
     """
-    lines = content.splitlines()  # split into lines without keeping '\n'
-    new_lines = []
-    i = 0
-
-    while i < len(lines):
-        # Make sure there *is* a next line to look at
-        if (
-            lines[i].strip() == "I" and
-            i + 1 < len(lines) and
-            lines[i + 1].lstrip().startswith("tem")
-        ):
-            merged_line = "I" + lines[i + 1].lstrip()  # e.g. "Item 1. ..."
-            new_lines.append(merged_line)
-            i += 2  # skip the next line because we've merged it
-        else:
-            new_lines.append(lines[i])
-            i += 1
-    return "\n".join(new_lines)
+    return "\n".join(_merge_I_tem_lines(iter_lines(content)))
+
+def _ensure_space_after_item_lines(lines):
+    for line in lines:
+        yield _ITEM_NO_SPACE.sub(r'\1 ', line) if "Item" in line else line
 
 def ensure_space_after_item(text: str) -> str:
     """
@@ -389,7 +630,24 @@ def ensure_space_after_item(text: str) -> str:
     Example:
       'Item1A' -> 'Item 1A'
     """
-    return re.sub(r'\b(Items?)\b(?=\S)', r'\1 ', text)
+    return _ITEM_NO_SPACE.sub(r'\1 ', text)
+
+def _merge_item_with_number_lines(lines):
+    prev = None
+    for line in lines:
+        if prev is None:
+            prev = line
+            continue
+        current = prev.strip()
+        next_stripped_leading = line.lstrip()
+        if current in ("Item", "Items") and next_stripped_leading and next_stripped_leading[0].isdigit():
+            yield f"{current} {next_stripped_leading}"                          # 'Item' + space + next line
+            prev = None
+        else:
+            yield prev
+            prev = line
+    if prev is not None:
+        yield prev
 
 def merge_item_with_number_line(text: str) -> str: # If a line is just 'Item'/'Items' and the following line starts with a number merges them
     """
@@ -400,32 +658,25 @@ def merge_item_with_number_line(text: str) -> str: # If a line is just 'Item'/'I
       "1. Business"
       -> "Item 1. Business"
     """
-    lines = text.splitlines()
-    new_lines = []
-    i = 0
-
-    while i < len(lines):
-        current = lines[i].strip()
-
-        # Check if this line is exactly 'Item' or 'Items'
-        if current in ("Item", "Items") and i + 1 < len(lines):
-            next_raw = lines[i + 1]
-            # Remove leading spaces to inspect the first real character
-            next_stripped_leading = next_raw.lstrip()
-
-            # Check if next line starts with a digit
-            if next_stripped_leading and next_stripped_leading[0].isdigit():
-                # Merge: 'Item' + space + next line (without leading spaces)
-                merged = f"{current} {next_stripped_leading}"
-                new_lines.append(merged)
-                i += 2  # skip the next line (already merged)
+    return "\n".join(_merge_item_with_number_lines(iter_lines(text)))
+
+def _merge_item_number_with_suffix_lines(lines):
+    prev = None
+    for line in lines:
+        if prev is None:
+            prev = line
+            continue
+        current_stripped = prev.strip()
+        if current_stripped.startswith("Item") and _ITEM_NUMBER.fullmatch(current_stripped):
+            next_stripped = line.lstrip()
+            if _LETTER_DOT.match(next_stripped) or next_stripped.startswith('.'):
+                yield current_stripped + next_stripped                          # e.g. 'Item 1' + 'A. Risk Factors'
+                prev = None
                 continue
-
-        # Default: keep line as-is
-        new_lines.append(lines[i])
-        i += 1
-
-    return "\n".join(new_lines)
+        yield prev
+        prev = line
+    if prev is not None:
+        yield prev
 
 def merge_item_number_with_suffix(text: str) -> str:
     """
@@ -434,29 +685,7 @@ def merge_item_number_with_suffix(text: str) -> str:
       - or just a dot (e.g., '. Risk Factors')
     then merge them into one line: 'Item 1A. Risk Factors' or 'Item 1. Risk Factors'.
     """
-    lines = text.splitlines()
-    new_lines = []
-    i = 0
-
-    while i < len(lines):
-        current_stripped = lines[i].strip()
-
-        # Match 'Item {number}' (e.g., 'Item 1', 'Item 12')
-        if re.fullmatch(r'Item\s+\d+', current_stripped) and i + 1 < len(lines):
-            next_raw = lines[i + 1]
-            next_stripped = next_raw.lstrip()
-
-            # Next line starts with 'A.' or 'b.' etc, OR with just '.'
-            if re.match(r'[A-Za-z]\.', next_stripped) or next_stripped.startswith('.'):
-                merged = current_stripped + next_stripped  # e.g. 'Item 1' + 'A. Risk Factors'
-                new_lines.append(merged)
-                i += 2
-                continue
-
-        # Default: keep line as-is
-        new_lines.append(lines[i])
-        i += 1
-    return "\n".join(new_lines)
+    return "\n".join(_merge_item_number_with_suffix_lines(iter_lines(text)))
 
 # --------------------------------------------------------------------------------------------------------------------
 #                                              MERGES THE FUNCTIONS
@@ -464,29 +693,114 @@ def merge_item_number_with_suffix(text: str) -> str:
 
 def print_10X(full_path, html_content, output_filename):
     """
-    Write cleaned filing text to disk.
+    Write cleaned filing text to disk, compressed according to `COMPRESSION`.
     """
-    with open(full_path, "w", encoding='utf-8') as new_file:
-        new_file.write(html_content)
+    storage.write_text(full_path, html_content)
     print("\nCleaned content saved in {}".format(output_filename))
 
-def cleaner(cik, output_filename):
+def quarantine(p, stage: str, scope: str, seconds: float, budget: TimeBudget, fallback: str, final: bool = False):
+    """
+    Append one record to the quarantine report (`QUARANTINE_PATH`) for a filing that
+    ran out of cleaning time, with the per-stage timings measured so far. `final` tells
+    that the fallback output replaced the raw submission, so it is kept until the cleaner
+    version changes instead of being cleaned again on the next run.
+    """
+    row = {
+        "filing": str(p),
+        "stage": stage,
+        "scope": scope,
+        "budget": seconds,
+        "elapsed": round(budget.elapsed(), 3),
+        "timings": {k: round(v, 3) for k, v in budget.timings.items()},
+        "fallback": fallback,
+        "final": final,
+        "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    QUARANTINE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(QUARANTINE_PATH, "a", encoding="utf-8") as f:
+        f.write(json.dumps(row) + "\n")
+    return row
+
+def clean_filing(p, output_filename, filing_budget: float = CLEAN_FILING_BUDGET,
+                 stage_budget: float = CLEAN_STAGE_BUDGET, use_cache: bool = True, records: list | None = None,
+                 raw_hash: str | None = None):
+    """
+    Clean a single filing folder: read 'full-submission.txt', run HTML cleaning +
+    item-heading normalization and write the result to `output_filename` inside `p`.
+
+    Cleaning runs under a wall-clock budget of `filing_budget` seconds, and
+    `stage_budget` seconds per stage. A filing that exceeds it is cleaned with
+    `clean_html_fallback` instead and recorded in the quarantine report. That output is
+    not cached; written to another file it is redone on the next run, but written over
+    the raw submission it stays (marked done) until the cleaner version changes.
+
+    With `use_cache`, results are looked up in and stored to `cleanCache`, keyed on
+    the raw content hash and the cleaner version; a hit skips the cleaning. `raw_hash`,
+    if already known (see `cleanCache.pending`), saves hashing the raw file again.
+
+    Plain-text filings are cleaned with `clean_text` (see `sniff_format`); when
+    `records` is given, (format, bytes, seconds) is appended to it for each filing cleaned.
+    """
+    full_path = os.path.join(p, output_filename)
+    raw_path = os.path.join(p,"full-submission.txt")
+    if not use_cache:
+        raw_hash = None
+    elif raw_hash is None:
+        raw_hash = cleanCache.content_hash(raw_path)
+    if raw_hash is not None and output_filename == "full-submission.txt" and cleanCache.is_output(raw_hash):
+        print(f"Up to date: {p}")                                       # already cleaned in place by this version
+        return full_path
+
+    html_content = cleanCache.get(raw_hash) if raw_hash is not None else None
+    cacheable = html_content is None
+    if html_content is None:
+        file_content = read_primary_document(raw_path)
+        with TimeBudget(filing_budget, stage_budget) as budget:
+            try:
+                fmt, html_content = clean_document(file_content, budget)    # html removal
+                html_content = budget.run("items", cleaning_items, html_content)
+            except BudgetExceeded as e:
+                print(f"[QUARANTINE] {p}: {e}; using the fallback cleaner")
+                fmt = sniff_format(file_content)
+                html_content = clean_html_fallback(file_content)
+                in_place = output_filename == "full-submission.txt"
+                quarantine(p, e.stage, e.scope, e.seconds, budget, fallback="clean_html_fallback", final=in_place)
+                cacheable = False                                           # not cached: a separate output is cleaned again on
+                                                                            # the next run; in place the raw text is gone
+            for stage, scope, spent in budget.overruns:                     # not interruptible outside the main thread
+                quarantine(p, stage, scope, spent, budget, fallback="none")
+        if records is not None:
+            records.append((fmt, len(file_content), budget.elapsed()))
+
+    index = documentIndex.cached(raw_path)
+    print_10X(full_path, html_content, output_filename)
+    if index is not None and output_filename == "full-submission.txt":     # raw submission overwritten:
+        documentIndex.rebind(raw_path, index)                           # keep its header fields
+    if raw_hash is not None and cacheable:
+        cleanCache.put(raw_hash, html_content)
+    if raw_hash is not None:
+        cleanCache.mark_output(cleanCache.content_hash(full_path))
+    return full_path
+
+def cleaner(cik, output_filename, filing_budget: float = CLEAN_FILING_BUDGET,
+            stage_budget: float = CLEAN_STAGE_BUDGET):
     """
     Clean all downloaded 10-K filings for a given CIK folder and write outputs.
 
     This function:
       - locates the 10-K folder under SEC_DIR/<ticker>/10-K,
       - iterates over subdirectories (each filing),
-      - reads 'full-submission.txt',
-      - runs HTML cleaning + item-heading normalization,
-      - writes the cleaned text to `output_filename` inside each filing directory.
+      - cleans each one with `clean_filing`, under the given time budgets.
     """
     folders_path = SEC_DIR / cik / "10-K"
-    for p in folders_path.iterdir():
+    folders = [p for p in folders_path.iterdir() if p.is_dir()]
+    digests = {}
+    todo = cleanCache.pending(folders, digests=digests)
+    print(f"{cik}: {len(todo)} of {len(folders)} filings need cleaning (cleaner version {cleanCache.version()})")
+    records = []
+    for p in folders:
         print(p)
-        full_path = os.path.join(p, output_filename)
-        html_content = os.path.join(p,"full-submission.txt")
-        html_content = print_clean_txt(html_content)                    # html removal
-        html_content = cleaning_items(html_content)
-        print_10X(full_path, html_content, output_filename)
+        clean_filing(p, output_filename, filing_budget, stage_budget, records=records, raw_hash=digests[p])
+    for line in format_report(records):
+        print(line)
     return
@@ -0,0 +1,327 @@
+import re
+
+# --------------------------------------------------------------------------------------------------------------------
+#                                                SINGLE-PASS MARKUP CLEANER
+# --------------------------------------------------------------------------------------------------------------------
+# `clean_markup` applies, in one left-to-right traversal, the same rules as the regex passes of
+# `htmlCleaner.clean_markup_regex` (remove_head_with_regex ... remove_numeric_entities). Every tag is read
+# once, from '<' to the first '>', and classified by the first rule of the regex pipeline that would have
+# matched it. A comment or xbrli block without an end leaves its opening tag in place, as the regex does.
+# Constructs on which the two could disagree (quotes spanning a tag boundary, '<' inside a tag, block ends the
+# earlier passes could create) raise `UnsupportedMarkup` so the caller can fall back.
+
+class UnsupportedMarkup(ValueError):
+    """
+    Raised when a document contains markup the single-pass cleaner cannot reproduce exactly.
+    """
+
+_STYLE = re.compile(r'\sstyle=(["\']).*?\1', re.IGNORECASE)
+_ID = re.compile(r'\s+id=(["\']).*?\1', re.IGNORECASE)
+_ALIGN = re.compile(r'\s+align=(["\']).*?\1', re.IGNORECASE)
+_ATTR_LEFT = re.compile(r'(?:\sstyle|\s+id|\s+align)=["\']', re.IGNORECASE)
+_ATTR_NAMES = re.compile(r'style=|id=|align=')                                   # literal prefilter for _ATTR_LEFT, on lowercase text
+_ENTITY_3 = re.compile(r'&#\d{3};')
+_NUMERIC_ENTITY = re.compile(r'&#(?:\d{1,8}|[xX][0-9A-Fa-f]{1,8});')
+_IX_OPEN = re.compile(r'<ix:[a-zA-Z0-9_:]+', re.IGNORECASE)
+_IX_CLOSE = re.compile(r'</ix:[a-zA-Z0-9_:]+>', re.IGNORECASE)
+_XBRLI_OPEN = re.compile(r'<xbrli:([a-zA-Z0-9_:]+)', re.IGNORECASE)
+_TAG_SPLIT = re.compile(r'(<[^>]*>)')
+_COMMENT_END = re.compile(r'-->')
+_HEAD_CLOSE = re.compile(r'</head>', re.IGNORECASE)
+_HEAD_OPEN = re.compile(r'<head>', re.IGNORECASE)
+_HEAD_BLOCK = re.compile(r'<head>.*?</head>', re.DOTALL | re.IGNORECASE)
+_LT_IN_TAG = re.compile(r'<[^>]*<')
+_SEP = "\x00"                                                                   # joins the tags for the batched attribute passes
+
+# unwrap_tags rules after the ix ones, in pipeline order: (prefix, exact, dotall, replacement)
+_UNWRAP_RULES = (
+    ("<html", False, True, "\n"), ("</html>", True, False, ""),
+    ("<font", False, True, "\n"), ("</font>", True, False, ""),
+    ("<br", False, True, ""), ("<hr", False, True, ""),
+    ("<b>", True, True, "\n"), ("</b>", True, False, ""),
+    ("<center>", True, True, "\n"), ("</center>", True, False, ""),
+    ("<a", False, True, "\n"), ("</a>", True, False, ""),
+    ("<table", False, True, "\n"), ("</table>", True, True, ""),
+    ("<tr", False, True, "\n"), ("</tr>", True, True, ""),
+    ("<td", False, True, "\n"), ("</td>", True, True, ""),
+)
+
+_REMOVED = 0                                                                    # tag deleted before loop_clean
+_BLANK = 1                                                                      # tag replaced by whitespace
+_CONTENT = 2                                                                    # tag still present at loop_clean
+_OPEN = 3                                                                       # exact <p> / <div>
+_CLOSE = 4                                                                      # exact </p> / </div>
+_JOINED = 5                                                                     # tag deleted before the entity replacements
+_HEAD = 6                                                                       # <head> ... </head>; this kind and the next ones
+_COMMENT = 7                                                                    # <!-- ... -->                  need more than
+_XBRLI = 8                                                                      # <xbrli:x> ... </xbrli:x>      a table lookup
+_INVALID = 9                                                                    # not reproducible: rendered holds the reason
+
+def _strip_attrs(s: str) -> str:
+    """
+    remove_style/id/align_with_regex on one tag or text segment.
+    """
+    if "=" not in s:
+        return s
+    s = _STYLE.sub("", s)
+    s = _ID.sub("", s)
+    s = _ALIGN.sub("", s)
+    if _ATTR_LEFT.search(s):                                                    # quoted value may run past this segment
+        raise UnsupportedMarkup("attribute value spans a tag boundary")
+    return s
+
+def _entities(s: str) -> str:
+    """
+    Entity replacements of remove_part_1 on one segment.
+    """
+    if "&" not in s:
+        return s
+    s = s.replace('&#8217;', "'").replace('&#8220;', '"').replace('&#8221;', '"')
+    s = s.replace('&nbsp;', ' ').replace('&#146;', "'")
+    return _ENTITY_3.sub(' ', s)
+
+def _classify(tag: str):
+    """
+    Return (kind, rendered text) for a tag after attribute and entity cleaning.
+    """
+    low = tag.lower()
+    nl = "\n" in tag
+    if low.startswith("<img") and not nl:
+        return _JOINED, ""
+    if tag == "<span>" or tag == "</span>":
+        return _JOINED, ""
+    if not nl and _IX_OPEN.match(tag):
+        return _BLANK, "\n"
+    if _IX_CLOSE.fullmatch(tag):
+        return _REMOVED, ""
+    for prefix, exact, dotall, repl in _UNWRAP_RULES:
+        if (low == prefix if exact else low.startswith(prefix)) and (dotall or not nl):
+            return (_BLANK if repl else _REMOVED), repl
+    if low in ("<p>", "<div>"):
+        return _OPEN, low[1:-1]
+    if low in ("</p>", "</div>"):
+        return _CLOSE, low[2:-1]
+    if nl:
+        return _CONTENT, tag                                                    # `<.*?>` cannot match across lines
+    return _CONTENT, ("\n" if low.startswith("<p") else "")
+
+def _check_skipped(span: str) -> str:
+    """
+    A skipped span (comment, xbrli block) must not contain a <head> block or an
+    attribute value running past its end, or the earlier regex passes could have moved it.
+    Returns the span with its attributes stripped.
+    """
+    stripped = _strip_attrs(span)
+    if _HEAD_OPEN.search(span):
+        raise UnsupportedMarkup("rewritable markup inside a removed block")
+    return stripped
+
+def _plain_info(tag: str):
+    """
+    Return (kind, rendered text, xbrli close patterns) for an attribute-stripped tag,
+    read as an ordinary tag. For an xbrli opener the rendered text is the (kind,
+    rendered text) the opener takes as an ordinary tag, should its block have no end.
+    """
+    cleaned = _entities(tag)
+    ordinary = _classify(cleaned)
+    m = _XBRLI_OPEN.match(cleaned)                                              # remove_xbrli_measure
+    if m:
+        return _XBRLI, ordinary, _xbrli_close(m.group(1))
+    return ordinary + (None,)
+
+def _tag_info(raw: str, tag: str | None, plain: dict):
+    """
+    Return (kind, rendered text, xbrli close patterns) for one raw tag, from '<' to the first '>',
+    given `tag`, the raw tag after the attribute passes (None if an attribute value runs past it),
+    and `plain`, the `_plain_info` of the stripped tags. For a comment the rendered text is the
+    (kind, rendered text) of the tag as an ordinary tag, should the comment have no end.
+    """
+    if len(raw) == 6 and raw.lower() == "<head>":
+        return _HEAD, "", None
+    if raw.find("<", 1) != -1:
+        info = (_INVALID, "'<' inside a tag", None)
+    elif tag is None:
+        info = (_INVALID, "attribute value spans a tag boundary", None)
+    else:
+        info = plain[tag]
+    if raw.startswith("<!--"):
+        return _COMMENT, info[:2], None
+    return info
+
+def _xbrli_close(name: str):
+    """
+    (closing tag of `name`, closing tag of `name` or of a prefix of it) patterns. The regex
+    backtracks into shorter names when the full one is never closed.
+    """
+    prefixes = "|".join(re.escape(name[:k]) for k in range(len(name), 0, -1))
+    return (re.compile(re.escape(f"</xbrli:{name}>"), re.IGNORECASE),
+            re.compile(f"</xbrli:(?:{prefixes})>", re.IGNORECASE))
+
+def _tag_infos(tags) -> dict:
+    """
+    `_tag_info` of each distinct raw tag. The attribute passes run once over all the tags
+    joined by NUL: their patterns cannot match across a NUL without removing it, so while
+    the number of tags is unchanged each one is stripped as if alone (otherwise the tags
+    are stripped one by one). Filings give most tags a unique id, which this removes
+    before the tags are classified.
+    """
+    tags = list(tags)
+    joined = _SEP.join(tags)
+    stripped = None
+    if joined.count(_SEP) == len(tags) - 1:
+        joined = _ALIGN.sub("", _ID.sub("", _STYLE.sub("", joined)))
+        stripped = joined.split(_SEP)
+        if len(stripped) != len(tags):
+            stripped = None
+        elif _ATTR_NAMES.search(joined.lower()) and _ATTR_LEFT.search(joined):  # quoted value may run past its tag
+            stripped = [None if _ATTR_LEFT.search(t) else t for t in stripped]
+    if stripped is None:
+        stripped = [_strip_tag(t) for t in tags]
+    plain = {tag: _plain_info(tag) for tag in set(stripped) if tag is not None}
+    return {raw: _tag_info(raw, tag, plain) for raw, tag in zip(tags, stripped)}
+
+def _strip_tag(tag: str) -> str | None:
+    try:
+        return _strip_attrs(tag)
+    except UnsupportedMarkup:
+        return None
+
+def _prepared_rest(parts, i, head: str = "") -> str:
+    """
+    `head` and the document from parts[i] on, with <head> blocks removed and attributes
+    stripped, as the regex pipeline has it when it removes comments. The passes between
+    that and the xbrli one only remove tags, which could join a closing tag only from
+    around a '<' inside a tag.
+    """
+    return _strip_attrs(_HEAD_BLOCK.sub("", head + "".join(parts[i:])))
+
+def _skip_to(parts, i, start, pattern):
+    """
+    Skip from parts[i][start:] past the next match of `pattern` (a closing tag or "-->",
+    which never straddles two parts). Returns (j, skipped text) with parts[j] the text
+    part that now starts right after the match, or None if there is no match.
+    """
+    skipped = []
+    j = i
+    while j < len(parts):
+        m = pattern.search(parts[j], start)
+        if m:
+            skipped.append(parts[j][start:m.start()])
+            rest = parts[j][m.end():]
+            if j % 2:                                                           # match ends inside a tag part
+                if "<" in rest:
+                    raise UnsupportedMarkup("removed block ends inside a tag")
+                j += 1
+                rest += parts[j]
+            parts[j] = rest
+            return j, "".join(skipped)
+        skipped.append(parts[j][start:])
+        j, start = j + 1, 0
+    return None
+
+def clean_markup(text: str) -> str:
+    """
+    Single-pass equivalent of the regex markup passes of `clean_html`.
+
+    Removes the <head> block, style/id/align attributes, comments, <img> tags, inline
+    XBRL blocks and all remaining tags, turns structural tags into newlines, drops
+    (nested) empty <p>/<div> elements and normalizes entities, in one traversal.
+    Raises `UnsupportedMarkup` on constructs where the result could differ.
+    """
+    parts = _TAG_SPLIT.split(text)                                              # text, tag, text, tag, ..., text
+    infos = _tag_infos(set(parts[1::2]))                                        # raw tag -> _tag_info; filings repeat the same tags
+    out = []
+    append = out.append
+    stack = []                                                                  # (name, len(out)) of open <p>/<div> with blank content
+    unstripped = ""                                                             # text joined across <head> blocks (removed before
+                                                                                # the attribute passes)
+    pending = ""                                                                # attribute-free text joined across comments, <img>
+                                                                                # and <span> tags (removed before remove_part_1
+                                                                                # replaces entities)
+    comments_end = True                                                         # False once no comment end is left to find
+    unclosed = set()                                                            # xbrli names no closing tag is left for
+    last = len(parts) - 1
+    i = 0
+
+    while True:
+        seg = parts[i]
+        if i == last:                                                           # no further tag; a trailing '<' stays text
+            pending += _strip_attrs(unstripped + seg)
+            break
+        raw = parts[i + 1]
+        kind, rendered, close = infos[raw]
+        i += 2
+
+        if kind >= _HEAD:
+            if kind == _HEAD:                                                   # remove_head_with_regex
+                skip = _skip_to(parts, i, 0, _HEAD_CLOSE)
+                if skip:
+                    unstripped, i = unstripped + seg, skip[0]
+                    continue
+                kind, rendered, close = _CONTENT, "", None                      # no </head>: an ordinary tag
+            elif kind == _COMMENT:
+                skip = _skip_to(parts, i - 1, 4, _COMMENT_END) if comments_end else None
+                if not skip:                                                    # `<!--.*?-->` has no match: the tag stays
+                    if comments_end and _COMMENT_END.search(_prepared_rest(parts, i, raw[4:])):
+                        raise UnsupportedMarkup("comment end made by the earlier passes")
+                    comments_end = False
+                    kind, rendered = rendered
+            elif kind == _XBRLI:
+                skip = _skip_to(parts, i, 0, close[0]) if close not in unclosed else None
+                if not skip:                                                    # no closing tag: the opener stays
+                    if close not in unclosed and (close[1].search(_prepared_rest(parts, i))
+                                                  or _LT_IN_TAG.search("".join(parts[i:]))):
+                        raise UnsupportedMarkup("unterminated xbrli block")
+                    unclosed.add(close)
+                    kind, rendered = rendered
+            if kind == _INVALID:
+                raise UnsupportedMarkup(rendered)
+        if unstripped:
+            seg, unstripped = unstripped + seg, ""
+        if "=" in seg:
+            seg = _strip_attrs(seg)
+        if pending:
+            seg = pending + seg
+        if kind == _JOINED:
+            pending = seg
+            continue
+        if kind == _COMMENT:
+            inner = _check_skipped(skip[1])
+            if _COMMENT_END.search(inner + "-->").start() < len(inner):           # stripping made an earlier end
+                raise UnsupportedMarkup("comment end made by the earlier passes")
+            pending, i = seg, skip[0]
+            continue
+        pending = ""
+        if seg:
+            if "&" in seg:
+                seg = _entities(seg)
+            append(seg)
+            if stack and seg and not seg.isspace():
+                stack.clear()
+
+        if kind == _REMOVED:
+            continue
+        if kind == _BLANK:
+            append(rendered)
+        elif kind == _OPEN:
+            stack.append((rendered, len(out)))
+            append("\n" if rendered == "p" else "")
+        elif kind == _CLOSE:
+            if stack and stack[-1][0] == rendered:                              # loop_clean: empty element
+                del out[stack.pop()[1]:]
+            else:
+                stack.clear()
+        elif kind == _CONTENT:
+            append(rendered)
+            stack.clear()
+        else:                                                                   # _XBRLI
+            inner = _check_skipped(skip[1])
+            if "<!--" in skip[1]:                                               # comments are removed before xbrli blocks
+                raise UnsupportedMarkup("comment inside an xbrli block")
+            if close[0].search(inner) or _LT_IN_TAG.search(skip[1]):            # an earlier pass could make an earlier close
+                raise UnsupportedMarkup("xbrli close made by the earlier passes")
+            i = skip[0]
+
+    if pending:
+        append(_entities(pending))
+    return _NUMERIC_ENTITY.sub("", "".join(out))
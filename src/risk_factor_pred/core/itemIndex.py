@@ -0,0 +1,85 @@
+import json
+from pathlib import Path
+from . import documentIndex, storage
+
+# --------------------------------------------------------------------------------------------------------------------
+#                                                ITEM OFFSET INDEX
+# --------------------------------------------------------------------------------------------------------------------
+# Instead of writing one item<N>.txt per item, the splitter can record where each item lies in the cleaned filing:
+# a sidecar `<name>.items.json` maps item labels to [start, end) byte offsets of the uncompressed text and holds
+# the signature of the file it describes. Items are then read by slicing the cleaned filing (mmap for plain
+# files, a seek in the decompressed stream for compressed ones, see `documentIndex.read_range`).
+
+INDEX_SUFFIX = ".items.json"
+
+def sidecar_path(path) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+def offsets(path, final_split) -> dict:
+    """
+    Stream the cleaned filing at `path` once and return {item_n: [start, end]} byte offsets,
+    with the same boundaries as `fx_splitter_10X.print_items`: each item runs from its
+    heading's `line_no` to the next heading's and the last one to the end of the file.
+    """
+    bounds = [(i['item_n'], i['line_no']) for i in final_split]
+    items = {}
+    k = -1                                                                      # index of the item being measured
+    start = pos = 0
+    with storage.open_bytes(path) as f:
+        for line_no, line in enumerate(f, start=1):
+            while k + 1 < len(bounds) and line_no >= bounds[k + 1][1]:
+                if k >= 0:
+                    items[bounds[k][0]] = [start, pos]
+                start = pos
+                k += 1
+            pos += len(line)
+    while k < len(bounds):                                                      # headings past the last line are empty
+        if k >= 0:
+            items[bounds[k][0]] = [start, pos]
+        start = pos
+        k += 1
+    return items
+
+def build(path, final_split) -> dict:
+    """
+    Compute the item offsets of the cleaned filing at `path` and write the sidecar.
+    """
+    index = {"items": offsets(path, final_split), **documentIndex.file_signature(path)}
+    sidecar = sidecar_path(path)
+    tmp = sidecar.with_name(sidecar.name + ".part")
+    tmp.write_text(json.dumps(index), encoding="utf-8")
+    tmp.replace(sidecar)
+    return index
+
+def cached(path) -> dict | None:
+    """
+    Return the item index of `path` if it still matches the file on disk, else None.
+    """
+    sidecar = sidecar_path(path)
+    if not sidecar.is_file() or not storage.exists(path):
+        return None
+    try:
+        index = json.loads(sidecar.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    signature = documentIndex.file_signature(path)
+    return index if all(index.get(k) == v for k, v in signature.items()) else None
+
+def has_item(path, item_n: str) -> bool:
+    """
+    True if the cleaned filing at `path` has a valid index with item `item_n`.
+    """
+    index = cached(path)
+    return index is not None and item_n in index["items"]
+
+def read_item(path, item_n: str, errors: str = "replace") -> str | None:
+    """
+    Text of item `item_n` (e.g. "1A") of the cleaned filing at `path`, or None if the
+    filing has no valid index or the index has no such item.
+    """
+    index = cached(path)
+    if index is None or item_n not in index["items"]:
+        return None
+    start, end = index["items"][item_n]
+    return documentIndex.read_range(path, start, end).decode("utf-8", errors=errors)
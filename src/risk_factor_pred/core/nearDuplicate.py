@@ -0,0 +1,51 @@
+import hashlib
+import numpy as np
+
+# --------------------------------------------------------------------------------------------------------------------
+#                                                ITEM 1A FINGERPRINTS
+# --------------------------------------------------------------------------------------------------------------------
+# Two cheap summaries of a tokenized Item 1A, stored with its token IDs (see `tokenCache`):
+#   - digest: a hash of the token sequence, i.e. of the text normalized the way the similarity measure sees it
+#     (lowercase words, punctuation and layout dropped). Equal digests mean distance 0 and similarity 1.
+#   - minhash: a MinHash signature of the set of SHINGLE-token shingles. The share of equal entries between two
+#     signatures estimates the Jaccard similarity of the shingle sets, which tells near-copies (most text
+#     unchanged) from rewritten sections before any edit distance is computed.
+
+SHINGLE = 5
+PERMUTATIONS = 64
+
+_rng = np.random.default_rng(0x1A)                                              # fixed: signatures are stored
+_MULT = _rng.integers(1, 1 << 63, PERMUTATIONS, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_ADD = _rng.integers(0, 1 << 63, PERMUTATIONS, dtype=np.uint64)
+_BASE = np.uint64(0x100000001B3)
+
+def digest(ids) -> str:
+    """
+    Hash of a token ID sequence.
+    """
+    return hashlib.sha1(np.asarray(ids, dtype="<i4").tobytes()).hexdigest()
+
+def shingles(ids) -> np.ndarray:
+    """
+    Distinct hashes (mod 2^64) of the SHINGLE-token windows of `ids`.
+    """
+    ids = np.asarray(ids, dtype=np.uint64)
+    if len(ids) < SHINGLE:
+        return np.unique(ids)
+    powers = _BASE ** np.arange(SHINGLE - 1, -1, -1, dtype=np.uint64)
+    return np.unique(np.lib.stride_tricks.sliding_window_view(ids, SHINGLE) @ powers)
+
+def minhash(ids) -> list:
+    """
+    MinHash signature (PERMUTATIONS ints) of the shingles of `ids`, one multiply-add hash per entry.
+    """
+    h = shingles(ids)
+    if len(h) == 0:
+        return [0] * PERMUTATIONS
+    return (np.multiply.outer(_MULT, h) + _ADD[:, None]).min(axis=1).tolist()
+
+def jaccard(sig_a, sig_b) -> float:
+    """
+    Estimated Jaccard similarity of the shingle sets behind two `minhash` signatures.
+    """
+    return float(np.mean(np.asarray(sig_a, dtype=np.uint64) == np.asarray(sig_b, dtype=np.uint64)))
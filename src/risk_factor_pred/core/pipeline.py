@@ -0,0 +1,128 @@
+from concurrent.futures import ProcessPoolExecutor
+import queue
+import threading
+import time
+
+# --------------------------------------------------------------------------------------------------------------------
+#                                                STAGE STATISTICS
+# --------------------------------------------------------------------------------------------------------------------
+
+class StageStats:
+    """
+    Throughput counters for one pipeline stage.
+
+    Tracks processed items, input bytes, failures and busy time (sum of per-item
+    processing time), measured against the wall-clock time since the stage started.
+    Safe to update from several threads.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.failed = 0
+        self.bytes = 0
+        self.busy = 0.0
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add(self, nbytes: int = 0, seconds: float = 0.0, ok: bool = True):
+        """
+        Record one processed item.
+        """
+        with self._lock:
+            self.items += 1
+            self.failed += 0 if ok else 1
+            self.bytes += nbytes
+            self.busy += seconds
+
+    def report(self) -> str:
+        """
+        One-line summary: items, MB, items/s, MB/s and busy time.
+        """
+        wall = max(time.perf_counter() - self.started, 1e-9)
+        mb = self.bytes / 1e6
+        return (f"{self.name}: {self.items} items ({self.failed} failed), {mb:.1f} MB in {wall:.1f}s "
+                f"-> {self.items / wall:.2f} items/s, {mb / wall:.2f} MB/s, busy {self.busy:.1f}s")
+
+# --------------------------------------------------------------------------------------------------------------------
+#                                                STAGED RUNNER
+# --------------------------------------------------------------------------------------------------------------------
+
+_DONE = object()
+
+class Stage:
+    """
+    One step of a streaming pipeline.
+
+    `func` maps an item to the item passed to the next stage (or None to drop it).
+    The stage reads from a bounded queue of `queue_size` items with `workers` threads;
+    when `processes` is True each thread hands its item to a process pool of the same
+    size, so CPU-bound stages use several cores.
+    """
+    def __init__(self, name: str, func, workers: int = 1, queue_size: int = 8, processes: bool = True):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.queue_size = queue_size
+        self.processes = processes
+        self.stats = StageStats(name)
+        self.errors = []
+
+def _stage_worker(stage, pool, q_in, q_out):
+    while True:
+        item = q_in.get()
+        if item is _DONE:
+            return
+        t0 = time.perf_counter()
+        try:
+            out = pool.submit(stage.func, item).result() if pool is not None else stage.func(item)
+            stage.stats.add(seconds=time.perf_counter() - t0)
+        except Exception as e:
+            out = None
+            stage.stats.add(seconds=time.perf_counter() - t0, ok=False)
+            stage.errors.append((item, str(e)))
+        if out is not None:
+            q_out.put(out)                                                      # blocks while the next stage is full
+
+def run_stages(source, stages, sink=None):
+    """
+    Stream items from `source` through `stages`, passing each result to `sink`.
+
+    `source` is a callable receiving an `emit(item)` function; it runs in its own
+    thread and blocks on `emit` whenever the first stage's queue is full. Each item
+    moves to the next stage as soon as the previous one is done with it, so stages
+    overlap instead of running one after another over the whole universe. `sink`
+    is called in the calling thread with every item leaving the last stage.
+    """
+    queues = [queue.Queue(maxsize=s.queue_size) for s in stages] + [queue.Queue(maxsize=stages[-1].queue_size)]
+    pools = [ProcessPoolExecutor(max_workers=s.workers) if s.processes else None for s in stages]
+
+    def _source():
+        try:
+            source(queues[0].put)
+        finally:
+            for _ in range(stages[0].workers):
+                queues[0].put(_DONE)
+
+    def _close(i, threads):
+        for t in threads:
+            t.join()
+        following = stages[i + 1].workers if i + 1 < len(stages) else 1
+        for _ in range(following):
+            queues[i + 1].put(_DONE)
+
+    threads = [threading.Thread(target=_source, daemon=True)]
+    for i, stage in enumerate(stages):
+        workers = [threading.Thread(target=_stage_worker, args=(stage, pools[i], queues[i], queues[i + 1]), daemon=True)
+                   for _ in range(stage.workers)]
+        threads += workers + [threading.Thread(target=_close, args=(i, workers), daemon=True)]
+    try:
+        for t in threads:
+            t.start()
+        while (item := queues[-1].get()) is not _DONE:
+            if sink is not None:
+                sink(item)
+    finally:
+        for pool in pools:
+            if pool is not None:
+                pool.shutdown()
+    return stages
@@ -1,9 +1,12 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from risk_factor_pred.consts import FORM, START_DATE, MAX_WORKERS, HTML_DIR, CIK_LIST
+from concurrent.futures import ProcessPoolExecutor
+from risk_factor_pred.consts import CIK_LIST, CLEAN_WORKERS, CLEAN_QUEUE_SIZE
+import asyncio
 import time
 import pandas as pd
-from . import htmlCleaner
-from sec_edgar_downloader import Downloader
+from . import htmlCleaner, storage
+from .asyncDownloader import AsyncDownloader
+from .downloadManifest import DownloadManifest
+from .pipeline import StageStats
 
 def load_unique_ciks():
     """
@@ -13,61 +16,82 @@ def load_unique_ciks():
     ciks = df["CIK"].astype(str).str.strip()
     return ciks.tolist()
 
-def download_for_cik(cik: str):
+async def _download_n_clean(ciks, download_stats, clean_stats, clean_errors, downloader=None,
+                            clean=htmlCleaner.clean_filing, backlog_size: int = CLEAN_QUEUE_SIZE):
     """
-    Download SEC filings for a given CIK using `sec-edgar-downloader`.
-    """
-    time.sleep(0.1)
-    dl = Downloader("MyCompanyName", "my.email@domain.com", str(HTML_DIR))
-    print(f"Starting {FORM} for CIK {cik}")
-    try:
-        dl.get(FORM, cik, after=START_DATE)
-        time.sleep(10)
-        return cik, "ok", None
-    except ValueError as e:
-        return cik, "not_found", str(e)
-    except Exception as e:
-        return cik, "error", str(e)
-
-def workerTasks(cik):
-    """
-    Execute the per-CIK workflow: download filings and then clean them.
+    Two-stage pipeline: async downloads feed a queue of filing folders that a process
+    pool drains, cleaning each filing as soon as it lands.
 
-    Steps:
-      1) download filings for the CIK (via `download_for_cik`),
-      2) zero-pad the CIK to 10 digits,
-      3) invoke the HTML cleaning routine to produce a cleaned text file.
+    The CPU-bound cleaning runs in separate processes, so it no longer holds the GIL
+    against the downloads. A filing takes one of `backlog_size` slots before its fetch
+    starts and gives it back once it is cleaned, so at most `backlog_size` filings are
+    in flight, waiting on disk or being cleaned: when cleaning falls behind, the
+    downloads wait. Accessions already recorded in the download manifest are not
+    fetched again. Yields `(cik, status, err)` tuples as CIKs finish downloading.
     """
-    tuple = download_for_cik(cik) 
-    htmlCleaner.cleaner(str(cik.zfill(10)), output_filename = "full-submission.txt")
-    return tuple
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    backlog = asyncio.Semaphore(backlog_size)
+
+    async def on_filing(cik10, path):
+        download_stats.add(storage.size(path))
+        queue.put_nowait(path.parent)                                          # bounded by the backlog slots
+
+    async def clean_worker(pool):
+        while True:
+            folder = await queue.get()
+            nbytes = storage.size(folder / "full-submission.txt")
+            t0 = time.perf_counter()
+            try:
+                await loop.run_in_executor(pool, clean, folder, "full-submission.txt")
+                clean_stats.add(nbytes, time.perf_counter() - t0)
+            except Exception as e:
+                clean_stats.add(nbytes, time.perf_counter() - t0, ok=False)
+                clean_errors.append((folder, str(e)))
+            finally:
+                backlog.release()
+                queue.task_done()
+
+    if downloader is None:
+        downloader = AsyncDownloader(manifest=DownloadManifest())
+    with ProcessPoolExecutor(max_workers=CLEAN_WORKERS) as pool:
+        workers = [asyncio.create_task(clean_worker(pool)) for _ in range(CLEAN_WORKERS)]
+        async for result in downloader.download_many(ciks, on_filing=on_filing, backlog=backlog):
+            yield result
+        await queue.join()
+        for w in workers:
+            w.cancel()
 
 def download_n_clean(ciks):
     """
-    Download and clean filings for a collection of CIKs using multithreading.
+    Download and clean filings for a collection of CIKs.
 
-    The function submits one task per CIK to a ThreadPoolExecutor and consumes
-    results as tasks finish using `as_completed`. It prints a progress counter
-    and summarizes not-found CIKs and errors at the end.
+    Downloads run concurrently on an asyncio event loop that shares one token bucket
+    across all in-flight requests, so the SEC rate limit is used fully instead of
+    sleeping between CIKs; a process pool cleans filings as they arrive. Results are
+    consumed as CIKs finish; the function prints a progress counter, summarizes
+    not-found CIKs and errors, and reports the throughput of each stage at the end.
     """
     total = len(ciks)
     print(f"Found {total} unique CIKs")
 
     not_found = []
     errors = []
+    clean_errors = []
+    download_stats, clean_stats = StageStats("download"), StageStats("clean")
 
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {executor.submit(workerTasks, cik): cik for cik in ciks}
-
-        # as_completed lets them run in parallel; we consume results as they finish
-        for idx, future in enumerate(as_completed(futures), start=1):
-            cik, status, err = future.result()
+    async def _consume():
+        idx = 0
+        async for cik, status, err in _download_n_clean(ciks, download_stats, clean_stats, clean_errors):
+            idx += 1
             print(f"[{idx}/{total}] CIK {cik}: {status}")
             if status == "not_found":
                 not_found.append(cik)
             elif status == "error":
                 errors.append((cik, err))
 
+    asyncio.run(_consume())
+
     if not_found:
         print("\nCIKs not found:")
         for cik in not_found:
@@ -78,6 +102,15 @@ def download_n_clean(ciks):
         print("\nCIKs with errors:")
         for cik, err in errors:
             print(f" {cik}: {err}")
+
+    if clean_errors:
+        print("\nFilings that failed cleaning:")
+        for folder, err in clean_errors:
+            print(f" {folder}: {err}")
+
+    print()
+    print(download_stats.report())
+    print(clean_stats.report())
     return
 
 def inputLetter():
@@ -0,0 +1,126 @@
+import gzip
+import io
+import os
+from pathlib import Path
+from risk_factor_pred.consts import COMPRESSION
+
+try:
+    import zstandard
+except ImportError:                                                             # optional dependency
+    zstandard = None
+
+# --------------------------------------------------------------------------------------------------------------------
+#                                                COMPRESSED FILE STORAGE
+# --------------------------------------------------------------------------------------------------------------------
+# Callers always use the logical path (e.g. <filing>/full-submission.txt). On disk the file may be stored
+# as-is, as <name>.gz or as <name>.zst; readers decompress transparently and writers use `COMPRESSION`.
+
+_SUFFIXES = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+def _variants(path) -> list[Path]:
+    path = Path(path)
+    return [path.with_name(path.name + suffix) for suffix in _SUFFIXES.values()]
+
+def resolve(path) -> Path:
+    """
+    Return the physical file backing the logical `path`.
+
+    If several variants exist (e.g. after an interrupted rewrite) the most recently
+    modified one wins. If none exists, `path` itself is returned.
+    """
+    existing = [p for p in _variants(path) if p.is_file()]
+    if not existing:
+        return Path(path)
+    return max(existing, key=lambda p: p.stat().st_mtime_ns)
+
+def exists(path) -> bool:
+    """
+    True if the logical `path` is stored in any format.
+    """
+    return any(p.is_file() for p in _variants(path))
+
+def _require_zstd():
+    if zstandard is None:
+        raise ImportError("zstd storage requires the optional 'zstandard' package")
+
+def _open_physical(path: Path, mode: str, encoding, errors):
+    name = path.name
+    if "b" in mode:
+        if name.endswith(".gz"):
+            return gzip.open(path, mode)
+        if name.endswith(".zst"):
+            _require_zstd()
+            return zstandard.open(path, mode)
+        return open(path, mode)
+    if name.endswith(".gz"):
+        return gzip.open(path, mode.replace("t", "") + "t", encoding=encoding, errors=errors)
+    if name.endswith(".zst"):
+        _require_zstd()
+        return zstandard.open(path, mode.replace("t", "") + "t", encoding=encoding, errors=errors)
+    return open(path, mode, encoding=encoding, errors=errors)
+
+def open_text(path, mode: str = "r", encoding: str = "utf-8", errors: str | None = None):
+    """
+    Open the logical `path` for reading or writing text, decompressing transparently.
+
+    Reading opens whichever variant is on disk. Writing creates `<path><suffix>` for the
+    configured `COMPRESSION`; use `write_text`/`write_bytes` to also drop stale variants.
+    """
+    if "r" in mode:
+        return _open_physical(resolve(path), mode, encoding, errors)
+    path = Path(path)
+    return _open_physical(path.with_name(path.name + _SUFFIXES[COMPRESSION]), mode, encoding, errors)
+
+def read_text(path, encoding: str = "utf-8", errors: str | None = None) -> str:
+    with open_text(path, "r", encoding=encoding, errors=errors) as f:
+        return f.read()
+
+def open_bytes(path):
+    """
+    Open the logical `path` for reading bytes, decompressing transparently.
+    """
+    return _open_physical(resolve(path), "rb", None, None)
+
+def read_bytes(path) -> bytes:
+    with open_bytes(path) as f:
+        return f.read()
+
+def _write(path, data, binary: bool, encoding: str = "utf-8"):
+    """
+    Write `data` to the logical `path` atomically (temporary file + rename) and remove
+    any variant stored in another format, so readers never see a stale copy.
+    """
+    path = Path(path)
+    target = path.with_name(path.name + _SUFFIXES[COMPRESSION])
+    tmp = target.with_name(target.name + ".part")
+    with open(tmp, "wb") as raw:
+        if target.name.endswith(".gz"):
+            stream = gzip.GzipFile(filename=path.name, mode="wb", compresslevel=6, fileobj=raw)
+        elif target.name.endswith(".zst"):
+            _require_zstd()
+            stream = zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+        else:
+            stream = raw
+        with stream:
+            if binary:
+                stream.write(data)
+            else:
+                with io.TextIOWrapper(stream, encoding=encoding) as text:
+                    text.write(data)
+    os.replace(tmp, target)
+    for p in _variants(path):
+        if p != target and p.is_file():
+            p.unlink()
+    return target
+
+def write_text(path, text: str, encoding: str = "utf-8") -> Path:
+    return _write(path, text, binary=False, encoding=encoding)
+
+def write_bytes(path, data: bytes) -> Path:
+    return _write(path, data, binary=True)
+
+def size(path) -> int:
+    """
+    On-disk size in bytes of the logical `path`.
+    """
+    return resolve(path).stat().st_size
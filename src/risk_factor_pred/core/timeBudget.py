@@ -0,0 +1,79 @@
+import signal
+import threading
+import time
+
+# --------------------------------------------------------------------------------------------------------------------
+#                                                WALL-CLOCK BUDGETS
+# --------------------------------------------------------------------------------------------------------------------
+# A malformed filing can make a backtracking regex run for minutes. The regex engine checks for pending signals
+# while it matches, so an interval timer (SIGALRM) can interrupt a stage that overruns its budget. Signals can
+# only be handled in the main thread of a process, which is where ProcessPoolExecutor workers run their tasks;
+# elsewhere stages run to completion and overruns are only recorded.
+
+class BudgetExceeded(TimeoutError):
+    """
+    Raised inside a stage whose time budget (or the remaining filing budget) ran out.
+    """
+    def __init__(self, stage: str, seconds: float, scope: str):
+        super().__init__(f"{stage} exceeded its {scope} budget of {seconds:g}s")
+        self.stage = stage
+        self.seconds = seconds
+        self.scope = scope                                                      # "stage" or "filing"
+
+class TimeBudget:
+    """
+    Wall-clock budget for one filing, split into stages run through `run`.
+
+    Each stage may use at most `stage_seconds`, and all stages together at most
+    `total_seconds`. `timings` holds the seconds spent per stage and `overruns`
+    the stages that went over budget without being interrupted.
+    """
+    def __init__(self, total_seconds: float, stage_seconds: float):
+        self.total_seconds = total_seconds
+        self.stage_seconds = stage_seconds
+        self.started = time.perf_counter()
+        self.timings = {}
+        self.overruns = []
+        self.preemptive = hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def run(self, stage: str, func, *args):
+        """
+        Call `func(*args)` as `stage`, interrupting it with `BudgetExceeded` when it runs
+        past the stage budget or the rest of the filing budget.
+        """
+        left = self.total_seconds - self.elapsed()
+        if left <= 0:
+            raise BudgetExceeded(stage, self.total_seconds, "filing")
+        seconds, scope = (self.stage_seconds, "stage") if self.stage_seconds <= left else (left, "filing")
+
+        t0 = time.perf_counter()
+        if not self.preemptive:
+            try:
+                return func(*args)
+            finally:
+                spent = time.perf_counter() - t0
+                self.timings[stage] = self.timings.get(stage, 0.0) + spent
+                if spent > seconds:
+                    self.overruns.append((stage, scope, spent))
+
+        def _expire(signum, frame):
+            raise BudgetExceeded(stage, seconds if scope == "stage" else self.total_seconds, scope)
+
+        previous = signal.signal(signal.SIGALRM, _expire)
+        signal.setitimer(signal.ITIMER_REAL, seconds)
+        try:
+            return func(*args)
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+            self.timings[stage] = self.timings.get(stage, 0.0) + time.perf_counter() - t0
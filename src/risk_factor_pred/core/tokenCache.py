@@ -0,0 +1,175 @@
+import json
+import uuid
+import numpy as np
+from pathlib import Path
+from risk_factor_pred.consts import TOKEN_VOCAB_PATH
+from . import nearDuplicate
+
+try:
+    import fcntl
+except ImportError:                                                             # not available on Windows
+    fcntl = None
+
+# --------------------------------------------------------------------------------------------------------------------
+#                                                TOKEN CACHE
+# --------------------------------------------------------------------------------------------------------------------
+# Each filing's Item 1A is tokenized once: its tokens are stored as an int32 array `<name>.tokens.npy` next to the
+# filing, with a `<name>.tokens.json` sidecar recording what the array was built from (signature of the source
+# text, tokenizer version, vocabulary id). A change in any of them makes the entry stale. The sidecar also holds
+# the fingerprints of the token sequence (`nearDuplicate.digest` and `minhash`), read back with `fingerprint`.
+#
+# IDs come from one corpus-level vocabulary, TOKEN_VOCAB_PATH: a text file with an id header line followed by
+# one token per line, the ID of a token being its line number. It is append-only, so IDs never change;
+# processes append new tokens under an exclusive file lock and first read what others appended.
+
+TOKENS_SUFFIX = ".tokens.npy"
+META_SUFFIX = ".tokens.json"
+
+class Vocabulary:
+    """
+    Append-only token <-> int32 ID mapping shared by all processes through `path`.
+    """
+    def __init__(self, path: Path = TOKEN_VOCAB_PATH):
+        self.path = Path(path)
+        self.id = None
+        self.words = []
+        self.ids = {}
+        self._offset = 0                                                        # bytes of `path` already read
+        with self._locked() as f:
+            self._refresh(f)
+
+    def _locked(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        f = open(self.path, "a+", encoding="utf-8")
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)                                       # released when `f` is closed
+        return f
+
+    def _refresh(self, f):
+        """
+        Read the lines appended to the file since the last refresh (`f` is locked).
+        """
+        f.seek(0, 2)
+        if f.tell() == 0:                                                       # new vocabulary
+            f.write(f"#{uuid.uuid4().hex}\n")
+            f.flush()
+        f.seek(self._offset)
+        lines = f.read().split("\n")[:-1]                                       # complete lines only
+        if self.id is None and lines:
+            self.id = lines.pop(0)[1:]
+        for word in lines:
+            self.ids[word] = len(self.words)
+            self.words.append(word)
+        self._offset = f.tell()
+
+    def encode(self, tokens) -> np.ndarray:
+        """
+        int32 IDs of `tokens`, adding the unknown ones to the vocabulary.
+        """
+        missing = {t for t in tokens if t not in self.ids}
+        if missing:
+            with self._locked() as f:
+                self._refresh(f)
+                new = [t for t in dict.fromkeys(tokens) if t not in self.ids]
+                if new:
+                    f.seek(0, 2)
+                    f.write("".join(f"{t}\n" for t in new))
+                    f.flush()
+                    self._refresh(f)
+        return np.fromiter((self.ids[t] for t in tokens), dtype=np.int32, count=len(tokens))
+
+    def refresh(self):
+        """
+        Load the tokens other processes appended since this one last read the file.
+        """
+        with self._locked() as f:
+            self._refresh(f)
+
+    def covers(self, ids) -> bool:
+        """
+        True if every ID of `ids` is known, reloading the file once if some are not
+        (another process may have added them after this one loaded the vocabulary).
+        """
+        top = int(np.max(ids)) if len(ids) else -1
+        if top >= len(self.words):
+            self.refresh()
+        return top < len(self.words)
+
+    def decode(self, ids) -> list:
+        if not self.covers(ids):
+            raise KeyError(f"token IDs beyond the vocabulary at {self.path}")
+        return [self.words[i] for i in ids]
+
+_vocabulary = None
+
+def vocabulary() -> Vocabulary:
+    """
+    The process-wide `Vocabulary` at TOKEN_VOCAB_PATH, loaded on first use.
+    """
+    global _vocabulary
+    if _vocabulary is None:
+        _vocabulary = Vocabulary()
+    return _vocabulary
+
+def _paths(base):
+    base = Path(base)
+    return base.with_name(base.name + TOKENS_SUFFIX), base.with_name(base.name + META_SUFFIX)
+
+def get(base, source: dict, version: str, vocab: Vocabulary | None = None) -> np.ndarray | None:
+    """
+    Cached token IDs stored for `base` (e.g. <filing>/item1A), or None if missing or stale.
+    IDs added to the vocabulary by other processes are loaded before the array is returned.
+    """
+    vocab = vocab or vocabulary()
+    tokens_path, meta_path = _paths(base)
+    if not (tokens_path.is_file() and meta_path.is_file()):
+        return None
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        expected = {"source": source, "tokenizer": version, "vocabulary": vocab.id}
+        if any(meta.get(k) != v for k, v in expected.items()) or "digest" not in meta:
+            return None
+        ids = np.load(tokens_path, allow_pickle=False)
+    except (OSError, ValueError):
+        return None
+    return ids if vocab.covers(ids) else None
+
+def put(base, ids: np.ndarray, source: dict, version: str, vocab: Vocabulary | None = None):
+    """
+    Store token IDs for `base` with the signature of their source text and their fingerprints.
+    """
+    vocab = vocab or vocabulary()
+    tokens_path, meta_path = _paths(base)
+    tmp = tokens_path.with_name(tokens_path.name + ".part")
+    with open(tmp, "wb") as f:
+        np.save(f, ids.astype(np.int32, copy=False), allow_pickle=False)
+    tmp.replace(tokens_path)
+    meta = {"source": source, "tokenizer": version, "vocabulary": vocab.id,
+            "digest": nearDuplicate.digest(ids), "minhash": nearDuplicate.minhash(ids)}
+    tmp = meta_path.with_name(meta_path.name + ".part")
+    tmp.write_text(json.dumps(meta), encoding="utf-8")
+    tmp.replace(meta_path)
+
+def token_ids(base, source: dict, version: str, load_text, tokenize, vocab: Vocabulary | None = None) -> np.ndarray:
+    """
+    Token IDs for `base`: from the cache when it matches `source` and `version`,
+    otherwise `tokenize(load_text())` encoded with the vocabulary and stored.
+    """
+    vocab = vocab or vocabulary()
+    ids = get(base, source, version, vocab)
+    if ids is None:
+        ids = vocab.encode(tokenize(load_text()))
+        put(base, ids, source, version, vocab)
+    return ids
+
+def fingerprint(base) -> dict | None:
+    """
+    {"digest", "minhash"} stored with the token IDs of `base`, or None if there are none.
+    Call after `token_ids`, which keeps them in step with the text.
+    """
+    _, meta_path = _paths(base)
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        return {"digest": meta["digest"], "minhash": meta["minhash"]}
+    except (OSError, ValueError, KeyError):
+        return None
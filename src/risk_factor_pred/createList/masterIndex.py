@@ -0,0 +1,157 @@
+import requests
+import pandas as pd
+from datetime import date
+from pathlib import Path
+from risk_factor_pred.consts import MASTER_INDEX_DIR, EDGAR_FULL_INDEX_URL, USER_AGENT
+
+HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept-Encoding": "gzip, deflate",
+}
+COLUMNS = ["CIK", "Company Name", "Form Type", "Date Filed", "Filename"]
+
+try:
+    import pyarrow  # noqa: F401                                                 # optional: enables Parquet caching
+    CACHE_SUFFIX = ".parquet"
+except ImportError:
+    CACHE_SUFFIX = ".csv.gz"
+
+# --------------------------------------------------------------------------------------------------------------------
+#                                                PARSING
+# --------------------------------------------------------------------------------------------------------------------
+
+def quarterly_master_url(year: int, qtr: int) -> str:
+    return f"{EDGAR_FULL_INDEX_URL}/{year}/QTR{qtr}/master.idx"
+
+def iter_master_rows(year: int, qtr: int):
+    """
+    Stream master.idx for a given year/quarter and yield one 5-tuple per filing:
+    (CIK, Company Name, Form Type, Date Filed, Filename).
+
+    Lines are parsed as they arrive; the header block and malformed lines are skipped.
+    """
+    url = quarterly_master_url(year, qtr)
+    print(f"Downloading {url} ...")
+    with requests.get(url, headers=HEADERS, timeout=30, stream=True) as r:
+        r.raise_for_status()
+        header_seen = False
+        for raw in r.iter_lines():
+            line = raw.decode("latin-1")
+            if not header_seen:
+                header_seen = line.startswith("CIK|")
+                continue
+            parts = line.split("|")
+            if len(parts) == 5:
+                yield parts
+
+def parse_master(year: int, qtr: int) -> pd.DataFrame:
+    """
+    Download and parse one quarter into a DataFrame with columns `COLUMNS`,
+    filling one list per column instead of one dict per row.
+    """
+    columns = [[] for _ in COLUMNS]
+    for parts in iter_master_rows(year, qtr):
+        for col, value in zip(columns, parts):
+            col.append(value)
+    return pd.DataFrame(dict(zip(COLUMNS, columns)))
+
+# --------------------------------------------------------------------------------------------------------------------
+#                                                CACHE
+# --------------------------------------------------------------------------------------------------------------------
+
+def _quarter_end(year: int, qtr: int) -> date:
+    return date(year + 1, 1, 1) if qtr == 4 else date(year, 3 * qtr + 1, 1)
+
+def _cache_path(year: int, qtr: int, suffix: str = CACHE_SUFFIX) -> Path:
+    return MASTER_INDEX_DIR / f"master_{year}_QTR{qtr}{suffix}"
+
+def _read_cache(path: Path) -> pd.DataFrame:
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path)
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+def load_quarter(year: int, qtr: int, refresh: bool = False) -> pd.DataFrame:
+    """
+    Return the master index of one quarter, from the local cache when possible.
+
+    Quarters that have ended are immutable on EDGAR, so they are cached once and
+    never downloaded again (unless `refresh`). The running quarter is always fetched.
+    """
+    if not refresh:
+        for suffix in ((".parquet", ".csv.gz") if CACHE_SUFFIX == ".parquet" else (".csv.gz",)):
+            path = _cache_path(year, qtr, suffix)
+            if path.is_file():
+                return _read_cache(path)
+
+    df = parse_master(year, qtr)
+    if _quarter_end(year, qtr) <= date.today():
+        MASTER_INDEX_DIR.mkdir(parents=True, exist_ok=True)
+        path = _cache_path(year, qtr)
+        if CACHE_SUFFIX == ".parquet":
+            df.to_parquet(path, index=False)
+        else:
+            df.to_csv(path, index=False, compression="gzip")
+        print(f"Cached {len(df)} rows to {path}")
+    return df
+
+def build_cache(start_year: int, end_year: int):
+    """
+    Make sure every quarter from `start_year` to `end_year` (inclusive) is cached locally.
+    """
+    for year in range(start_year, end_year + 1):
+        for qtr in range(1, 5):
+            if date(year, 3 * qtr - 2, 1) <= date.today():
+                load_quarter(year, qtr)
+
+# --------------------------------------------------------------------------------------------------------------------
+#                                                QUERY
+# --------------------------------------------------------------------------------------------------------------------
+
+def query(start: date, end: date, forms=("10-K",), form_prefix: str | None = None, name_prefix: str | None = None,
+          dedupe: bool = False) -> pd.DataFrame:
+    """
+    Return all filings with `Date Filed` between `start` and `end` (inclusive).
+
+    Parameters
+    ----------
+    start, end : datetime.date
+        Filing-date range; only the quarters overlapping it are loaded.
+    forms : iterable[str] | None
+        Keep only these exact form types (e.g. ("10-K", "10KSB", "10-KT")); None keeps all.
+    form_prefix : str | None
+        Keep only form types starting with this prefix (e.g. "10-K" also keeps "10-K/A").
+    name_prefix : str | None
+        Keep only companies whose name starts with this prefix (case-insensitive).
+    dedupe : bool
+        Keep only the first row of each consecutive block of equal CIKs.
+    """
+    frames = []
+    for year in range(start.year, end.year + 1):
+        for qtr in range(1, 5):
+            q_start, q_end = date(year, 3 * qtr - 2, 1), _quarter_end(year, qtr)
+            if q_end <= start or q_start > end or q_start > date.today():
+                continue
+            df = load_quarter(year, qtr)
+            mask = (df["Date Filed"] >= start.isoformat()) & (df["Date Filed"] <= end.isoformat())
+            if forms is not None:
+                mask &= df["Form Type"].isin(list(forms))
+            if form_prefix is not None:
+                mask &= df["Form Type"].str.startswith(form_prefix)
+            if name_prefix is not None:
+                mask &= df["Company Name"].str.strip().str.upper().str.startswith(name_prefix.upper())
+            frames.append(df[mask])
+
+    out = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=COLUMNS)
+    if dedupe:
+        out = out[out["CIK"].shift() != out["CIK"]].reset_index(drop=True)
+    return out
+
+def filing_urls(start: date, end: date, **filters) -> list[str]:
+    """
+    Full-submission URLs of the filings matched by `query(start, end, **filters)`.
+    """
+    df = query(start, end, **filters)
+    return ("https://www.sec.gov/Archives/" + df["Filename"]).tolist()
+
+if __name__ == "__main__":
+    build_cache(2005, date.today().year)
@@ -0,0 +1,99 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from risk_factor_pred.core import secDownloader, filingPipeline
+from risk_factor_pred.core.asyncDownloader import AsyncDownloader
+from risk_factor_pred.core.pipeline import Stage, StageStats, run_stages
+from risk_factor_pred.consts import MAX_CONCURRENT_CIKS
+
+# Backpressure check for the download -> clean pipeline: a stand-in for EDGAR serves CIKS companies of FILINGS
+# filings each, much faster than a deliberately slow cleaner consumes them (it sleeps, then deletes the filing
+# folder). The number of raw filings on disk is sampled after every write and must never exceed the backlog
+# given to `secDownloader._download_n_clean`; without backpressure it grows to nearly CIKS * FILINGS. The same
+# check then runs `filingPipeline.download_source` into one slow stage, where the bound is set by the CIKs the
+# downloader works on (PIPELINE_CIKS), the CIKs handed over or waiting to be, and the stage's queue and worker.
+
+CIKS = 40
+FILINGS = 6
+BACKLOG = 8
+CLEAN_SECONDS = 0.02
+PIPELINE_CIKS = 2
+STAGE_QUEUE = 2
+RAW_NAMES = {"full-submission.txt", "full-submission.txt.gz", "full-submission.txt.zst"}
+
+class LocalDownloader(AsyncDownloader):
+    """
+    `AsyncDownloader` answering every request locally and counting the raw filings on disk.
+    """
+    def __init__(self, save_dir, **kwargs):
+        super().__init__(save_dir=save_dir, rate=10_000, **kwargs)
+        self.peak = 0
+
+    async def resolve_cik(self, cik):
+        return str(cik).zfill(10)
+
+    async def list_filings(self, cik10, form=None, after=None):
+        return [f"{cik10}-{i:02d}" for i in range(FILINGS)]
+
+    async def _get(self, url):
+        await asyncio.sleep(0.001)
+        return b"<SEC-DOCUMENT>\n<TEXT>Item 1A. Risk Factors</TEXT>\n</SEC-DOCUMENT>\n"
+
+    async def fetch_filing(self, cik10, accession, form=None):
+        path = await super().fetch_filing(cik10, accession)
+        self.peak = max(self.peak, raw_filings(self.save_dir))
+        return path
+
+def raw_filings(root: Path) -> int:
+    """
+    Raw filings under `root`, not counting sidecars or files still being written by other
+    threads; `os.walk` skips the folders the cleaner deletes meanwhile.
+    """
+    return sum(1 for _, _, names in os.walk(root) for name in names if name in RAW_NAMES)
+
+def slow_clean(folder, output_filename):
+    time.sleep(CLEAN_SECONDS)
+    shutil.rmtree(folder)
+
+async def run_download_n_clean(root: Path):
+    downloader = LocalDownloader(root)
+    stats, clean_stats, errors = StageStats("download"), StageStats("clean"), []
+    async for cik, status, err in secDownloader._download_n_clean(range(CIKS), stats, clean_stats, errors,
+                                                                  downloader=downloader, clean=slow_clean,
+                                                                  backlog_size=BACKLOG):
+        assert status == "ok", (cik, status, err)
+    assert clean_stats.items == CIKS * FILINGS and not errors, (clean_stats.report(), errors)
+    return downloader.peak
+
+def slow_stage(item):
+    for folder in item["filings"]:
+        slow_clean(folder, "full-submission.txt")
+    return item
+
+def run_pipeline_source(root: Path):
+    downloader = LocalDownloader(root)
+    stage = Stage("clean", slow_stage, workers=1, queue_size=STAGE_QUEUE, processes=False)
+    done = []
+    run_stages(filingPipeline.download_source(range(CIKS), StageStats("download"), downloader=downloader,
+                                              max_ciks=PIPELINE_CIKS), [stage], sink=done.append)
+    assert len(done) == CIKS and not stage.errors, stage.errors
+    return downloader.peak
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        peak = asyncio.run(run_download_n_clean(Path(tmp)))
+        print(f"download_n_clean: {CIKS * FILINGS} filings, {MAX_CONCURRENT_CIKS} CIKs at once, "
+              f"peak {peak} raw filings on disk (backlog {BACKLOG}), {time.perf_counter() - t0:.2f}s")
+        assert peak <= BACKLOG, f"{peak} raw filings on disk, more than the backlog of {BACKLOG}"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        peak = run_pipeline_source(Path(tmp))
+        bound = (PIPELINE_CIKS + 2 + STAGE_QUEUE + 1) * FILINGS                    # downloading, queued + in emit, stage
+        print(f"download_source: {CIKS * FILINGS} filings, {PIPELINE_CIKS} CIKs at once, "
+              f"peak {peak} raw filings on disk (bound {bound}), {time.perf_counter() - t0:.2f}s")
+        assert peak <= bound, f"{peak} raw filings on disk, more than the bound of {bound}"
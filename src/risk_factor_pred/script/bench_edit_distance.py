@@ -0,0 +1,125 @@
+import random
+import time
+from risk_factor_pred.core import editDistance
+
+# Equivalence check and benchmark for the token edit distance: compares the bit-parallel
+# `editDistance.levenshtein` used by `fx_similarity.levenshtein_tokens` with the former two-row
+# Wagner-Fischer DP, first on many small random pairs (exact equality), then on Item 1A-sized
+# pairs with a few percent of edited tokens (timing; the DP is only run up to DP_MAX tokens).
+# The small pairs also check the `max_distance` cutoff, and the large ones time a threshold-only
+# call (`max_distance` = THRESHOLD_RATE of the length) next to the full distance.
+# Last, pairs edited by whole blocks (inserted, deleted, moved or reworded passages, as between
+# two years of an Item 1A) compare `levenshtein`, which skips the unchanged text, with the full pass.
+
+SMALL_CASES = 3000
+SIZES = [500, 1500, 5000, 15000]
+DP_MAX = 1500
+VOCAB = 3000
+EDIT_RATE = 0.05
+THRESHOLD_RATE = 0.01
+BLOCK_EDITS = [(5000, 10), (15000, 10), (15000, 40), (30000, 60)]
+
+def wagner_fischer(a_tokens, b_tokens) -> int:
+    m, n = len(a_tokens), len(b_tokens)
+    if n > m:
+        a_tokens, b_tokens = b_tokens, a_tokens
+        m, n = n, m
+    prev = list(range(n + 1))
+    for i in range(1, m + 1):
+        cur = [i] + [0] * n
+        ai = a_tokens[i - 1]
+        for j in range(1, n + 1):
+            cost = 0 if ai == b_tokens[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+        prev = cur
+    return prev[n]
+
+def bit_parallel(a_tokens, b_tokens) -> int:
+    _, (a_ids, b_ids) = editDistance.intern(a_tokens, b_tokens)
+    return editDistance.levenshtein(a_ids, b_ids)
+
+def edited_pair(size: int, rnd: random.Random):
+    """
+    A random token sequence and a copy with EDIT_RATE of its tokens substituted, deleted or inserted.
+    """
+    words = [f"w{i}" for i in range(VOCAB)]
+    a = [rnd.choice(words) for _ in range(size)]
+    b = []
+    for t in a:
+        r = rnd.random()
+        if r < EDIT_RATE / 3:
+            b.append(rnd.choice(words))
+        elif r < 2 * EDIT_RATE / 3:
+            continue
+        elif r < EDIT_RATE:
+            b.extend((t, rnd.choice(words)))
+        else:
+            b.append(t)
+    return a, b
+
+def edited_blocks(size: int, edits: int, rnd: random.Random):
+    """
+    A random token sequence (Zipf-like frequencies) and a copy with `edits` passages of 20-120
+    tokens inserted, deleted, moved or partly reworded.
+    """
+    def token():
+        return f"w{min(int(rnd.paretovariate(1.1)), VOCAB)}"
+    a = [token() for _ in range(size)]
+    b = list(a)
+    for _ in range(edits):
+        r, i, length = rnd.random(), rnd.randrange(len(b)), rnd.randint(20, 120)
+        if r < 0.35:
+            b[i:i] = [token() for _ in range(length)]
+        elif r < 0.6:
+            del b[i:i + length]
+        elif r < 0.8:
+            moved = b[i:i + length]
+            del b[i:i + length]
+            j = rnd.randrange(len(b))
+            b[j:j] = moved
+        else:
+            for k in range(i, min(i + length, len(b)), 7):
+                b[k] = token()
+    return a, b
+
+def timed(func, *args):
+    t0 = time.perf_counter()
+    out = func(*args)
+    return out, time.perf_counter() - t0
+
+if __name__ == "__main__":
+    rnd = random.Random(0)
+    for case in range(SMALL_CASES):
+        alphabet = "abcdef"[:rnd.randint(1, 6)]
+        a = [rnd.choice(alphabet) for _ in range(rnd.randint(0, 80))]
+        b = [rnd.choice(alphabet) for _ in range(rnd.randint(0, 80))]
+        ref = wagner_fischer(a, b)
+        assert bit_parallel(a, b) == ref, f"distance differs on case {case}: {a} {b}"
+        k = rnd.randint(0, 40)
+        _, (a_ids, b_ids) = editDistance.intern(a, b)
+        assert editDistance.levenshtein(a_ids, b_ids, max_distance=k) == (ref if ref <= k else None), \
+            f"max_distance={k} differs on case {case}: {a} {b}"
+    print(f"{SMALL_CASES} random small pairs: identical distances")
+
+    print(f"{'tokens':>7} {'distance':>9} {'DP':>10} {'bit-parallel':>13} {'speedup':>9} {'threshold':>10}")
+    for size in SIZES:
+        a, b = edited_pair(size, rnd)
+        dist, t_new = timed(bit_parallel, a, b)
+        _, (a_ids, b_ids) = editDistance.intern(a, b)
+        _, t_cut = timed(editDistance.levenshtein, a_ids, b_ids, None, int(THRESHOLD_RATE * size))
+        if size <= DP_MAX:
+            ref, t_ref = timed(wagner_fischer, a, b)
+            assert dist == ref, f"distance differs at {size} tokens"
+            print(f"{size:>7} {dist:>9} {t_ref:>9.3f}s {t_new:>12.4f}s {t_ref / t_new:>8.0f}x {t_cut:>9.4f}s")
+        else:
+            print(f"{size:>7} {dist:>9} {'-':>10} {t_new:>12.4f}s {'-':>9} {t_cut:>9.4f}s")
+
+    print(f"{'tokens':>7} {'edits':>6} {'distance':>9} {'full pass':>10} {'trimmed':>10} {'speedup':>9}")
+    for size, edits in BLOCK_EDITS:
+        a, b = edited_blocks(size, edits, rnd)
+        _, (a_ids, b_ids) = editDistance.intern(a, b)
+        longer, shorter = (a_ids, b_ids) if len(a_ids) >= len(b_ids) else (b_ids, a_ids)
+        ref, t_ref = timed(editDistance._bit_parallel, longer, shorter)
+        dist, t_new = timed(editDistance.levenshtein, a_ids, b_ids)
+        assert dist == ref, f"distance differs on {size} tokens with {edits} block edits"
+        print(f"{size:>7} {edits:>6} {dist:>9} {t_ref:>9.3f}s {t_new:>9.3f}s {t_ref / t_new:>8.1f}x")
@@ -0,0 +1,45 @@
+import re
+import time
+from risk_factor_pred.core import htmlCleaner, htmlTokenizer
+
+# Regression benchmark for the removal of nested empty <p>/<div> wrappers: compares `htmlCleaner.loop_clean`
+# (one regex pass, then one stack sweep over the runs of these tags if empty elements are left) and the tokenizer
+# used by `clean_html` with the former fixed-point loop, which re-ran two full-document substitutions once per
+# nesting level. Up to a few levels the fixed point's C-level passes are as fast or faster than the sweep's Python
+# loop over tags; the sweep keeps the cost linear as nesting grows.
+
+DEPTHS = [1, 4, 16, 64, 256]
+BLOCKS = 2000
+
+def fixed_point(html_content):
+    p_pattern = re.compile(r'<p>\s*</p>', re.DOTALL | re.IGNORECASE)
+    div_pattern = re.compile(r'<div>\s*</div>', re.IGNORECASE)
+    while True:
+        pre_cleaning_content = html_content
+        html_content = re.sub(p_pattern, '', html_content)
+        html_content = re.sub(div_pattern, '', html_content)
+        if html_content == pre_cleaning_content:
+            return html_content
+
+def nested_document(depth: int, blocks: int = BLOCKS) -> str:
+    """
+    `blocks` paragraphs, each preceded by `depth` levels of empty <div>/<p> wrappers.
+    """
+    opens = "".join("<div>\n" if i % 2 else "<P> " for i in range(depth))
+    closes = "".join(" </p>" if i % 2 == 0 else "</DIV>\n" for i in reversed(range(depth)))
+    return "".join(f"{opens}{closes}<p>Risk factor paragraph {i}.</p>\n" for i in range(blocks))
+
+def timed(func, arg):
+    t0 = time.perf_counter()
+    out = func(arg)
+    return out, time.perf_counter() - t0
+
+if __name__ == "__main__":
+    print(f"{'depth':>6} {'MB':>6} {'fixed point':>12} {'loop_clean':>11} {'tokenizer':>10}")
+    for depth in DEPTHS:
+        doc = nested_document(depth)
+        ref, t_ref = timed(fixed_point, doc)
+        out, t_new = timed(htmlCleaner.loop_clean, doc)
+        _, t_tok = timed(htmlTokenizer.clean_markup, doc)
+        assert out == ref, f"loop_clean differs from the fixed point at depth {depth}"
+        print(f"{depth:>6} {len(doc) / 1e6:>6.2f} {t_ref:>11.3f}s {t_new:>10.3f}s {t_tok:>9.3f}s")
@@ -0,0 +1,101 @@
+import io
+import random
+import sys
+import time
+from contextlib import redirect_stdout
+from risk_factor_pred.core import fx_splitter_10X as fs
+from risk_factor_pred.consts import SEC_DIR
+
+# Regression benchmark for the TOC-round selection: compares the indexed `fx_splitter_10X.final_list`
+# with the former version, which rescanned the whole heading list for every (round, label) pair and
+# trimmed "Item 400"-like numbers with repeated list.remove(max(...)).
+# Heading lists come from the cleaned filings under SEC_DIR; pass a number to cap how many are read.
+# Without a corpus, synthetic lists with a growing number of cross-references are used instead.
+
+CROSS_REFS = [0, 100, 1000, 5000]
+REPEAT = 20
+
+def number_of_rounds_scan(item_dict):
+    listAllItems = [int("".join(ch for ch in r["item_n"] if ch.isdigit())) for r in item_dict]
+    while max(listAllItems) > 20:
+        listAllItems.remove(max(listAllItems))
+    max_num = max(listAllItems)
+    rounds = [i for i in listAllItems if i == max_num]
+    rounds2 = [i for i in listAllItems if i == max_num - 1]
+    return len(rounds2 if rounds > rounds2 else rounds)
+
+def final_list_scan(tableContent, item_dict):
+    list_lines = []
+    last_ele = 0
+    for _ in range(number_of_rounds_scan(item_dict)):
+        lines = []
+        for itemTC in tableContent:
+            for r in item_dict:
+                if itemTC == r.get('item_n') and r.get('line_no') > last_ele:
+                    lines.append(r)
+                    last_ele = r['line_no']
+                    break
+        list_lines.append(lines)
+    diff = 0
+    for i in range(len(list_lines)):
+        n = list_lines[i][-1]['line_no'] - list_lines[i][1]['line_no']
+        if n > diff:
+            num = i
+            diff = n
+    return list_lines[num]
+
+def corpus_heading_lists(limit: int):
+    """
+    item_dict_builder output of up to `limit` cleaned filings under SEC_DIR.
+    """
+    out = []
+    for path in sorted(SEC_DIR.glob("*/10-K/*/full-submission.txt*")):
+        if path.name.endswith(".idx.json"):
+            continue
+        out.append((path.parent.name, fs.item_dict_builder(path.with_name("full-submission.txt"))))
+        if len(out) >= limit:
+            break
+    return out
+
+def synthetic_heading_list(cross_refs: int, seed: int = 0):
+    """
+    A table of contents, the item headings and `cross_refs` 'Item N' mentions in between
+    (to the items filings usually cite, so the round count stays that of the real headings).
+    """
+    rnd = random.Random(seed)
+    toc = ["1", "1A", "1B", "2", "3", "4", "5", "6", "7", "7A", "8", "9", "9A", "9B", "10", "11", "12", "13", "14", "15"]
+    cited = ["1", "1A", "3", "7", "7A", "8", "9A"]
+    rows = [{"item_n": n, "line_no": 10 + i} for i, n in enumerate(toc)]
+    body = sorted(rnd.sample(range(100, 100 + 50 * (cross_refs + len(toc))), cross_refs + len(toc)))
+    refs = set(rnd.sample(range(len(body)), cross_refs))
+    heads = iter(toc)
+    for k, line in enumerate(body):
+        rows.append({"item_n": rnd.choice(cited) if k in refs else next(heads, "15"), "line_no": line})
+    return fs._dedupe(rows)
+
+def timed(func, *args):
+    t0 = time.perf_counter()
+    for _ in range(REPEAT):
+        out = func(*args)
+    return out, (time.perf_counter() - t0) / REPEAT
+
+def compare(name: str, item_dict):
+    with redirect_stdout(io.StringIO()):                                        # table_content_builder prints
+        try:
+            tableContent = fs.table_content_builder(item_dict)
+            ref, t_ref = timed(final_list_scan, tableContent, item_dict)
+            out, t_new = timed(fs.final_list, tableContent, item_dict)
+        except (ValueError, IndexError, UnboundLocalError):                     # no usable item sequence
+            return
+    assert out == ref, f"final_list differs from the scanning version on {name}"
+    print(f"{name:>24} {len(item_dict):>9} {t_ref * 1e3:>11.2f}ms {t_new * 1e3:>10.2f}ms {t_ref / t_new:>8.1f}x")
+
+if __name__ == "__main__":
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    lists = corpus_heading_lists(limit)
+    if not lists:
+        print(f"no cleaned filings under {SEC_DIR}; using synthetic heading lists")
+        lists = [(f"synthetic +{n} refs", synthetic_heading_list(n)) for n in CROSS_REFS]
+    print(f"{'filing':>24} {'headings':>9} {'scan':>13} {'indexed':>12} {'speedup':>9}")
+    for name, item_dict in lists:
+        compare(name, item_dict)
@@ -0,0 +1,140 @@
+import random
+import sys
+import time
+from risk_factor_pred.core import htmlCleaner, htmlTokenizer
+from risk_factor_pred.consts import SEC_DIR
+
+# Equivalence check and benchmark for the markup cleaning: `htmlTokenizer.clean_markup` (single traversal) must
+# give exactly the output of the regex passes of `htmlCleaner.clean_markup_regex`, or raise UnsupportedMarkup so
+# that `clean_html` falls back to them. Checked first on FUZZ_CASES random documents assembled from the tags,
+# attributes and entity fragments the rules treat specially (including entities split by removed tags), then
+# timed on synthetic inline-XBRL filings of SYNTHETIC_MB, with tags repeated or made unique by per-tag ids, and
+# on the raw primary documents under SEC_DIR; pass a number to cap how many are read.
+#
+# The random documents of PIECES are mostly malformed (a '<' inside a tag, blocks without an end) and a share of
+# them falls back; the speedup depends on how many distinct tags a filing has, since each distinct tag is
+# stripped and classified once. Best of 5 on a shared machine: about 1.5-2x on the shared-tag document and
+# 1.1-1.3x with unique ids, where the per-tag attribute passes dominate; single runs vary more than that.
+
+FUZZ_CASES = 20000
+SYNTHETIC_MB = 7.0
+PIECES = [
+    "<p>", "</p>", "<P>", "</P>", "<div>", "</div>", "<DIV>", "<p class=x>", "<p\nclass=x>",
+    "<span>", "</span>", "<img src=a>", "<IMG\nsrc=a>", "<br>", "<br/>", "<hr>", "<b>", "</B>",
+    "<font size=2>", "</font>", "<center>", "</center>", "<a href=x>", "</a>", "<table>", "</table>",
+    "<tr>", "</tr>", "<td>", "</td>", "<html>", "</html>", "<head>", "</head>", "<!--", "-->",
+    "<ix:nonNumeric name=x>", "</ix:nonNumeric>", "<xbrli:measure>", "</xbrli:measure>", "<xbrli:unit id='u'>",
+    "</xbrli:unit>", " style=\"color:red\"", " id='x'", " align=\"left\"", "<td style='a'>", "<div id=\"d\">",
+    "&#", "123;", "&#146;", "&#8217;", "&#8220;", "&#8221;", "&#x1F4A9;", "&#12345;", "&nb", "sp;", "&nbsp;",
+    "&amp;", "Risk", " factors ", "Item 1A.", "\n", " ", "  ", "\t", "<", ">", "=", "'", "\"",
+]
+ENTITY_PIECES = [                                                               # well-formed: rarely unsupported
+    "&#", "&", "#", "123;", "146;", "8217;", "&nb", "sp;", "<img src=a>", "<span>", "</span>", "<!-- c -->",
+    "<head>h</head>", "<br>", "<b>", "</ix:x>", "<p>", "</p>", "<div>", "</div>", "x", " ", "\n",
+]
+WORDS = "our business could be adversely affected by competition regulation and market conditions".split()
+
+def random_document(rnd: random.Random) -> str:
+    pieces = PIECES if rnd.random() < 0.5 else ENTITY_PIECES
+    return "".join(rnd.choice(pieces) for _ in range(rnd.randint(1, 40)))
+
+def synthetic_document(mb: float, unique_ids: bool, seed: int = 0) -> str:
+    """
+    Inline-XBRL style filing of about `mb` MB: styled <div>/<span> paragraphs and
+    tables of tagged facts, with an id on most tags if `unique_ids`.
+    """
+    rnd = random.Random(seed)
+    count = 0
+
+    def uid():
+        nonlocal count
+        count += 1
+        return f' id="i{count:08x}"' if unique_ids else ""
+
+    def paragraph():
+        text = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(10, 60)))
+        return (f'<div{uid()} style="margin-top:6pt;text-align:justify"><span{uid()} style="color:#000000;'
+                f'font-family:\'Times New Roman\';font-size:10pt">{text}&#8217;s</span>'
+                f'<span style="font-size:10pt">&#160;</span></div>\n')
+
+    def table():
+        rows = "".join(f'<tr{uid()}><td style="width:40%;padding:0"><p style="font-size:8pt"><span>Row {i}</span></p>'
+                       f'</td><td style="text-align:right"><ix:nonFraction name="us-gaap:X"{uid()} '
+                       f'contextRef="c{count}">1,234</ix:nonFraction></td></tr>\n' for i in range(10))
+        return f'<table style="border-collapse:collapse">{rows}</table>\n'
+
+    parts, size = ["<html><head><title>10-K</title></head><body>"], 0
+    while size < mb * 1e6:
+        parts.append(paragraph() if rnd.random() < 0.8 else table())
+        size += len(parts[-1])
+    parts.append("</body></html>")
+    return "".join(parts)
+
+def compare(doc: str):
+    """
+    Return (regex output, tokenizer output or None if unsupported).
+    """
+    ref = htmlCleaner.clean_markup_regex(doc)
+    try:
+        return ref, htmlTokenizer.clean_markup(doc)
+    except htmlTokenizer.UnsupportedMarkup:
+        return ref, None
+
+def corpus_documents(limit: int):
+    """
+    Primary documents of up to `limit` raw (not yet cleaned) filings under SEC_DIR.
+    """
+    out = []
+    for path in sorted(SEC_DIR.glob("*/10-K/*/full-submission.txt*")):
+        if path.name.endswith(".json"):
+            continue
+        text = htmlCleaner.read_primary_document(path.with_name("full-submission.txt"))
+        if htmlCleaner.sniff_format(text) == "html":
+            out.append((path.parent.name, text))
+        if len(out) >= limit:
+            break
+    return out
+
+def timed(func, arg, repeat: int = 1):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = func(arg)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return out, best
+
+def time_document(name: str, doc: str, repeat: int = 1):
+    ref, t_ref = timed(htmlCleaner.clean_markup_regex, doc, repeat)
+    try:
+        out, t_new = timed(htmlTokenizer.clean_markup, doc, repeat)
+    except htmlTokenizer.UnsupportedMarkup as e:
+        print(f"{name:>24} {len(doc) / 1e6:>6.2f} {t_ref:>8.3f}s {'fallback':>10}  ({e})")
+        return
+    assert out == ref, f"clean_markup differs from the regex passes on {name}"
+    print(f"{name:>24} {len(doc) / 1e6:>6.2f} {t_ref:>8.3f}s {t_new:>9.3f}s {t_ref / t_new:>7.2f}x")
+
+if __name__ == "__main__":
+    rnd = random.Random(0)
+    unsupported = 0
+    for case in range(FUZZ_CASES):
+        doc = random_document(rnd)
+        ref, out = compare(doc)
+        if out is None:
+            unsupported += 1
+            continue
+        assert out == ref, f"clean_markup differs on case {case}: {doc!r}\n  regex:     {ref!r}\n  tokenizer: {out!r}"
+    print(f"{FUZZ_CASES} random documents: identical output ({unsupported} or "
+          f"{unsupported / FUZZ_CASES:.1%} fall back to the regex passes)")
+
+    print(f"{'document':>24} {'MB':>6} {'regex':>9} {'tokenizer':>10} {'speedup':>8}")
+    for unique_ids in (False, True):
+        name = "synthetic, unique ids" if unique_ids else "synthetic, shared tags"
+        time_document(name, synthetic_document(SYNTHETIC_MB, unique_ids), repeat=5)
+
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    docs = corpus_documents(limit)
+    if not docs:
+        print(f"no raw HTML filings under {SEC_DIR}")
+    for name, doc in docs:
+        time_document(name, doc)
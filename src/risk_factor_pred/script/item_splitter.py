@@ -1,6 +1,6 @@
+import time
 from risk_factor_pred.core import fx_splitter_10X as fs, secDownloader as sd
 from risk_factor_pred.consts import SEC_DIR, MAX_WORKERS
-from concurrent.futures import ProcessPoolExecutor
 
 if __name__ == "__main__":
     cik = "0000002098"
@@ -17,10 +17,15 @@ if __name__ == "__main__":
                     if p.is_dir():
                         paths.append(p)
 
-        # process all filings in parallel
-        with ProcessPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            list(executor.map(fs.try_exercize, paths))
-        print(paths)
+        # process all filings in parallel, largest first, streaming one record per filing
+        records = []
+        t0 = time.perf_counter()
+        for record in fs.split_many(paths, MAX_WORKERS):
+            records.append(record)
+            if not record["ok"]:
+                print(f"failed: {record['filing']}: {record['error']}")
+        for line in fs.utilization_report(records, time.perf_counter() - t0, MAX_WORKERS):
+            print(line)
     else:
         p = SEC_DIR / cik / "10-K" / filings
-        fs.try_exercize(p)
\ No newline at end of file
+        print(fs.try_exercize(p))
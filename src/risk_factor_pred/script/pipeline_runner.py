@@ -0,0 +1,19 @@
+import csv
+from risk_factor_pred.core import filingPipeline as fp, secDownloader as sd
+from risk_factor_pred.consts import TABLES_DIR
+
+SAVE_DIR = TABLES_DIR / "similarity.csv"
+
+if __name__ == "__main__":
+
+    # Create list of ciks from excel file or request cik in input
+    ciks = sd.load_unique_ciks() if sd.inputLetter() == 'l' else [input("Enter CIK...").upper()]
+
+    # Download, clean, split and compare each CIK as soon as the previous stage is done with it
+    fieldnames = ["ticker", "date_a", "date_b", "distance", "similarity", "len_a", "len_b", "sentiment"]
+    TABLES_DIR.mkdir(parents=True, exist_ok=True)
+    with open(SAVE_DIR, "a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        if f.tell() == 0:
+            writer.writeheader()
+        fp.run_pipeline(ciks, writer)
@@ -16,5 +16,7 @@ if __name__ == "__main__":
         writer = csv.DictWriter(f, fieldnames=fieldnames)
         writer.writeheader()
 
+        triaged = []
         for cik in ciks:
-            sf.concurrency_runner(writer, cik)
\ No newline at end of file
+            triaged.extend(sf.concurrency_runner(writer, cik))
+    print(sf.triage_report(triaged))
\ No newline at end of file